@@ -0,0 +1,279 @@
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+
+from dataset import UKURAN_CHUNK_BAWAAN, baca_bertahap, baca_partisi, baris_terakhir_per_customer
+
+# Dimensi kubus agregat yang dipakai seluruh section dashboard
+DIMENSI_KUBUS = [
+    'customer_status',
+    'gender',
+    'married',
+    'contract',
+    'internet_type',
+    'churn_category',
+    'churn_reason',
+    'kelompok_umur'
+]
+
+# Kolom yang dibutuhkan untuk membangun kubus (dipakai juga oleh mode streaming)
+KOLOM_KUBUS = DIMENSI_KUBUS[:-1] + ['age', 'customer_id', 'total_revenue']
+
+# Jumlah proses worker untuk agregasi paralel (1 = serial di proses utama)
+JUMLAH_WORKER = int(os.environ.get('CHURN_JUMLAH_WORKER', 1))
+
+# Jumlah bin distribusi usia (sama dengan nbins histogram di dashboard)
+JUMLAH_BIN_UMUR = 10
+
+# Tepi bin usia dihitung sekali dari seluruh data
+# Jika semua usia sama (mis. extract satu baris), rentang dilebarkan setengah tahun ke tiap sisi
+# supaya tepi bin tetap unik (pd.cut menolak tepi yang sama)
+def tepi_bin_umur(umur, jumlah_bin = JUMLAH_BIN_UMUR):
+    umur_min, umur_max = umur.min(), umur.max()
+    if umur_min == umur_max:
+        umur_min, umur_max = umur_min - 0.5, umur_max + 0.5
+
+    return (np.linspace(umur_min, umur_max, jumlah_bin + 1))
+
+# Bangun kubus agregat (jumlah customer & total revenue) dalam satu kali groupby
+def bangun_kubus(data, tepi_umur = None):
+    # customer_id yang belum divalidasi saat load memakai aturan yang sama (baris terakhir per customer_id),
+    # jadi satu customer tidak pernah terhitung di lebih dari satu sel kubus
+    if not data.attrs.get('customer_id_unik', False):
+        data = baris_terakhir_per_customer(data)
+
+    if tepi_umur is None:
+        tepi_umur = tepi_bin_umur(data['age'])
+
+    kelompok_umur = pd.cut(
+        data['age'],
+        bins = tepi_umur,
+        labels = False,
+        include_lowest = True
+    ).rename('kelompok_umur')
+
+    grup = data.groupby(
+        [data[kolom] for kolom in DIMENSI_KUBUS[:-1]] + [kelompok_umur],
+        observed = True,
+        dropna = False
+    )
+
+    kubus = grup['total_revenue'].sum().to_frame()
+    kubus.insert(0, 'jumlah_customer', grup.size())
+    kubus = kubus.reset_index()
+
+    kubus.attrs['tepi_umur'] = tuple(np.asarray(tepi_umur).tolist())
+
+    return (kubus)
+
+# Perbarui kubus tanpa hitung ulang: kurangi kontribusi baris lama lalu tambahkan baris baru
+# Tepi bin usia tetap, pemanggil harus membangun ulang kubus jika tepi bin seluruh data berubah
+def perbarui_kubus(kubus, dikurangi, ditambah):
+    tepi_umur = np.asarray(kubus.attrs['tepi_umur'])
+
+    daftar_kubus = [kubus]
+    if len(dikurangi):
+        kubus_dikurangi = bangun_kubus(dikurangi, tepi_umur)
+        kubus_dikurangi[['jumlah_customer', 'total_revenue']] *= -1
+        daftar_kubus.append(kubus_dikurangi)
+    if len(ditambah):
+        daftar_kubus.append(bangun_kubus(ditambah, tepi_umur))
+
+    gabungan = pd.concat(
+        [bagian.astype({kolom : object for kolom in DIMENSI_KUBUS[:-1]}) for bagian in daftar_kubus],
+        ignore_index = True
+    )
+
+    kubus_baru = gabungan.groupby(
+        DIMENSI_KUBUS,
+        dropna = False
+    )[['jumlah_customer', 'total_revenue']].sum().reset_index()
+
+    kubus_baru = kubus_baru[kubus_baru['jumlah_customer'] != 0].reset_index(drop = True)
+    kubus_baru = kubus_baru.astype({kolom : 'category' for kolom in DIMENSI_KUBUS[:-1]})
+    kubus_baru.attrs['tepi_umur'] = tuple(tepi_umur.tolist())
+
+    return (kubus_baru)
+
+# Agregat parsial satu chunk: sama seperti kubus tapi per usia (belum di-bin) agar bisa digabung
+# Jumlah customer = jumlah baris, customer_id berulang antar chunk ditangani lipat_kubus
+def kubus_parsial(chunk):
+    parsial = chunk.groupby(
+        DIMENSI_KUBUS[:-1] + ['age'],
+        observed = True,
+        dropna = False
+    ).agg(
+        jumlah_customer = ('customer_id', 'size'),
+        total_revenue = ('total_revenue', 'sum')
+    ).reset_index()
+
+    return (parsial.astype({'jumlah_customer' : 'int64'}))
+
+# Gabungkan beberapa agregat parsial menjadi satu (kategori tiap chunk bisa berbeda)
+def gabung_kubus_parsial(daftar_parsial):
+    gabungan = pd.concat(
+        [parsial.astype({kolom : object for kolom in DIMENSI_KUBUS[:-1]}) for parsial in daftar_parsial],
+        ignore_index = True
+    )
+
+    gabungan = gabungan.groupby(
+        DIMENSI_KUBUS[:-1] + ['age'],
+        dropna = False
+    )[['jumlah_customer', 'total_revenue']].sum().reset_index()
+
+    return (gabungan)
+
+# Ubah agregat parsial hasil gabungan menjadi kubus final (usia di-bin dengan tepi dari seluruh data)
+def kubus_dari_parsial(parsial, tepi_umur = None):
+    if tepi_umur is None:
+        tepi_umur = tepi_bin_umur(parsial['age'])
+
+    parsial = parsial.assign(
+        kelompok_umur = pd.cut(parsial['age'], bins = tepi_umur, labels = False, include_lowest = True)
+    )
+
+    kubus = parsial.groupby(
+        DIMENSI_KUBUS,
+        dropna = False
+    )[['jumlah_customer', 'total_revenue']].sum().reset_index()
+
+    kubus = kubus.astype({kolom : 'category' for kolom in DIMENSI_KUBUS[:-1]})
+    kubus.attrs['tepi_umur'] = tuple(np.asarray(tepi_umur).tolist())
+
+    return (kubus)
+
+# Hash 64-bit customer_id untuk mendeteksi customer_id berulang antar chunk tanpa menyimpan ID-nya (8 byte per baris)
+def hash_customer_id(chunk):
+    return (pd.util.hash_pandas_object(chunk['customer_id'], index = False).to_numpy())
+
+# Lintasan pertama: agregat parsial dan hash customer_id satu chunk
+def ringkas_chunk(chunk):
+    return (kubus_parsial(chunk), hash_customer_id(chunk))
+
+# Lintasan kedua (hanya jika ada customer_id berulang): baris dengan hash berulang dipisahkan untuk
+# dideduplikasi di akhir, sisanya pasti unik dan langsung dilipat ke agregat parsial
+def pisah_chunk(chunk, hash_berulang):
+    berulang = np.isin(hash_customer_id(chunk), hash_berulang)
+
+    return (kubus_parsial(chunk[~berulang]), chunk[berulang])
+
+def ringkas_partisi(partisi):
+    return (ringkas_chunk(baca_partisi(partisi, KOLOM_KUBUS)))
+
+def pisah_partisi(partisi, hash_berulang):
+    return (pisah_chunk(baca_partisi(partisi, KOLOM_KUBUS), hash_berulang))
+
+# Lipat hasil per chunk (berurutan sesuai sumber) menjadi kubus, dengan aturan customer_id berulang
+# yang sama seperti load in-memory: hanya baris terakhir per customer_id yang dihitung
+# petakan(fungsi) menjalankan fungsi pada tiap chunk/partisi sumber dan dipanggil sekali lagi hanya jika
+# ada hash customer_id berulang; baris berulang (biasanya sedikit) dideduplikasi dengan customer_id aslinya,
+# sehingga tabrakan hash tidak mengubah hasil
+def lipat_kubus(petakan, ringkas, pisah):
+    parsial, daftar_hash = None, []
+    for parsial_chunk, hash_chunk in petakan(ringkas):
+        parsial = parsial_chunk if parsial is None else gabung_kubus_parsial([parsial, parsial_chunk])
+        daftar_hash.append(hash_chunk)
+
+    nilai_hash, jumlah = np.unique(np.concatenate(daftar_hash), return_counts = True)
+    hash_berulang = nilai_hash[jumlah > 1]
+    if not len(hash_berulang):
+        return (kubus_dari_parsial(parsial))
+
+    parsial, daftar_berulang = None, []
+    for parsial_chunk, baris_berulang in petakan(functools.partial(pisah, hash_berulang = hash_berulang)):
+        parsial = parsial_chunk if parsial is None else gabung_kubus_parsial([parsial, parsial_chunk])
+        daftar_berulang.append(baris_berulang)
+
+    baris_berulang = pd.concat(daftar_berulang, ignore_index = True)
+    baris_berulang = baris_berulang[~baris_berulang['customer_id'].duplicated(keep = 'last').to_numpy()]
+
+    return (kubus_dari_parsial(gabung_kubus_parsial([parsial, kubus_parsial(baris_berulang)])))
+
+# Bangun kubus dari sumber yang dibaca per chunk (memori terbatas ukuran chunk & hash customer_id)
+def bangun_kubus_bertahap(sumber, ukuran_chunk = UKURAN_CHUNK_BAWAAN):
+    return (lipat_kubus(
+        lambda fungsi: map(fungsi, baca_bertahap(sumber, ukuran_chunk, KOLOM_KUBUS)),
+        ringkas_chunk,
+        pisah_chunk
+    ))
+
+# Bangun kubus dari partisi sumber secara paralel di process pool
+# Hasil worker digabung berurutan sesuai urutan partisi sehingga identik dengan jalur serial
+def bangun_kubus_paralel(daftar_partisi, jumlah_worker = JUMLAH_WORKER):
+    if jumlah_worker <= 1:
+        return (lipat_kubus(lambda fungsi: map(fungsi, daftar_partisi), ringkas_partisi, pisah_partisi))
+
+    # Worker di-spawn (bukan fork): dipanggil dari server Streamlit yang multi-thread, fork bisa deadlock
+    with ProcessPoolExecutor(max_workers = jumlah_worker, mp_context = multiprocessing.get_context('spawn')) as pool:
+        return (lipat_kubus(lambda fungsi: pool.map(fungsi, daftar_partisi), ringkas_partisi, pisah_partisi))
+
+# Ambil irisan kubus: filter per dimensi (list nilai) lalu jumlahkan ke dimensi yang diminta
+def iris_kubus(kubus, dimensi, saring = None, dropna = True):
+    if saring:
+        mask = np.ones(len(kubus), dtype = bool)
+        for kolom, nilai in saring.items():
+            mask &= kubus[kolom].isin(nilai).to_numpy()
+        kubus = kubus[mask]
+
+    irisan = kubus.groupby(
+        dimensi,
+        as_index = False,
+        observed = True,
+        dropna = dropna
+    )[['jumlah_customer', 'total_revenue']].sum()
+
+    return (irisan)
+
+# Ringkasan alasan churn per kategori dengan satu langkah ranking tervektorisasi
+# top_n membatasi jumlah alasan per kategori, sisanya digabung menjadi 'Lainnya'
+def peringkat_alasan_churn(kubus, top_n = None):
+    alasan = iris_kubus(kubus, ['churn_category', 'churn_reason'])
+    alasan = alasan[['churn_category', 'churn_reason', 'jumlah_customer']].rename(columns = {'jumlah_customer' : 'total_cust_churn_per_reason'})
+
+    per_kategori = alasan.groupby('churn_category', observed = True)['total_cust_churn_per_reason']
+    alasan['total_cust_churn_per_category'] = per_kategori.transform('sum')
+    alasan['peringkat'] = per_kategori.rank(method = 'first', ascending = False).astype('int64')
+
+    if top_n is not None and (alasan['peringkat'] > top_n).any():
+        lainnya = (alasan['peringkat'] > top_n).to_numpy()
+        sisa = alasan[lainnya].groupby('churn_category', observed = True, as_index = False).agg(
+            total_cust_churn_per_reason = ('total_cust_churn_per_reason', 'sum'),
+            total_cust_churn_per_category = ('total_cust_churn_per_category', 'first')
+        )
+        sisa = sisa.assign(churn_reason = 'Lainnya', peringkat = top_n + 1)
+
+        alasan = pd.concat([alasan[~lainnya].astype({'churn_reason' : str}), sisa[alasan.columns]], ignore_index = True)
+
+    alasan = alasan.sort_values(
+        by = ['total_cust_churn_per_category', 'total_cust_churn_per_reason'],
+        ascending = True,
+        ignore_index = True
+    )
+
+    return (alasan)
+
+# Jumlah customer per bin usia untuk tiap (status, gender), dihitung sekali dari kubus
+# Distribusi usia untuk pilihan status apa pun cukup menjumlahkan baris-baris kecil ini
+def histogram_umur(kubus):
+    tepi_umur = kubus.attrs['tepi_umur']
+    jumlah_bin = len(tepi_umur) - 1
+
+    hist = iris_kubus(kubus, ['customer_status', 'gender', 'kelompok_umur'])
+    hist = hist.pivot_table(
+        index = ['customer_status', 'gender'],
+        columns = 'kelompok_umur',
+        values = 'jumlah_customer',
+        aggfunc = 'sum',
+        fill_value = 0,
+        observed = True
+    )
+
+    hist = hist.reindex(columns = range(jumlah_bin), fill_value = 0).astype('int64')
+    hist.columns.name = 'kelompok_umur'
+    hist.attrs = {'tepi_umur' : tepi_umur}
+
+    return (hist)
@@ -0,0 +1,126 @@
+# Lapisan aset: file yang ikut di repo disajikan lokal (gambar di-inline sebagai base64),
+# sumber remote diunduh di background (asyncio, dengan timeout) ke cache di disk.
+# Render tidak pernah menunggu jaringan; tanpa koneksi aplikasi tetap jalan dari file lokal/cache.
+from pathlib import Path
+import asyncio
+import base64
+import functools
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+import urllib.request
+
+DIR_ASET = Path(__file__).resolve().parent
+
+# Folder cache unduhan sumber remote
+DIR_CACHE_ASET = Path(os.environ.get('CHURN_ASET_CACHE_DIR', DIR_ASET / '.aset'))
+
+# Batas waktu unduh per sumber (detik)
+TIMEOUT_ASET = float(os.environ.get('CHURN_ASET_TIMEOUT', 10))
+
+# Sumber yang gagal diunduh tidak dicoba ulang otomatis sebelum jeda ini (detik)
+JEDA_ULANG_ASET = 60
+
+_kunci_prefetch = threading.Lock()
+_sedang_diunduh = set()
+_waktu_gagal = {}
+
+# Lokasi cache di disk untuk satu URL (nama file = hash URL + ekstensi aslinya)
+def path_cache(url, dir_cache = DIR_CACHE_ASET):
+    nama = hashlib.blake2b(url.encode(), digest_size = 16).hexdigest()
+
+    return (Path(dir_cache) / f'{nama}{Path(url.split("?")[0]).suffix}')
+
+# File lokal jika ada, selain itu hasil unduhan di cache, selain itu None (belum tersedia)
+def cari_aset(path_lokal, url = None, dir_cache = DIR_CACHE_ASET):
+    if path_lokal is not None and Path(path_lokal).is_file():
+        return (Path(path_lokal))
+    if url is not None and path_cache(url, dir_cache).is_file():
+        return (path_cache(url, dir_cache))
+
+    return (None)
+
+# Unduh satu URL ke cache secara atomik (dijalankan di thread oleh event loop)
+def unduh_ke_cache(url, timeout = TIMEOUT_ASET, dir_cache = DIR_CACHE_ASET):
+    path = path_cache(url, dir_cache)
+    path.parent.mkdir(parents = True, exist_ok = True)
+    path_sementara = path.with_suffix(f'{path.suffix}.{os.getpid()}.{threading.get_ident()}.tmp')
+
+    with urllib.request.urlopen(url, timeout = timeout) as respon, open(path_sementara, 'wb') as file:
+        while blok := respon.read(1 << 20):
+            file.write(blok)
+    os.replace(path_sementara, path)
+
+    return (path)
+
+async def unduh_semua(daftar_url, timeout = TIMEOUT_ASET, dir_cache = DIR_CACHE_ASET):
+    async def unduh(url):
+        try:
+            path = await asyncio.wait_for(asyncio.to_thread(unduh_ke_cache, url, timeout, dir_cache), timeout)
+        except Exception:
+            with _kunci_prefetch:
+                _waktu_gagal[url] = time.monotonic()
+            raise
+        finally:
+            with _kunci_prefetch:
+                _sedang_diunduh.discard(url)
+
+        return (path)
+
+    return (await asyncio.gather(*[unduh(url) for url in daftar_url], return_exceptions = True))
+
+# Mulai unduh URL yang belum ada di cache secara bersamaan di thread background (tidak menunggu hasilnya)
+# Sumber yang gagal/timeout dicoba lagi setelah JEDA_ULANG_ASET, atau langsung jika paksa = True
+def mulai_prefetch(daftar_url, timeout = TIMEOUT_ASET, dir_cache = DIR_CACHE_ASET, paksa = False):
+    with _kunci_prefetch:
+        sekarang = time.monotonic()
+        daftar_url = [
+            url for url in dict.fromkeys(daftar_url)
+            if url and url not in _sedang_diunduh and not path_cache(url, dir_cache).is_file()
+            and (paksa or sekarang - _waktu_gagal.get(url, -JEDA_ULANG_ASET) >= JEDA_ULANG_ASET)
+        ]
+        _sedang_diunduh.update(daftar_url)
+        for url in daftar_url:
+            _waktu_gagal.pop(url, None)
+
+    if not daftar_url:
+        return (None)
+
+    thread = threading.Thread(
+        target = asyncio.run,
+        args = (unduh_semua(daftar_url, timeout, dir_cache), ),
+        name = 'prefetch-aset',
+        daemon = True
+    )
+    thread.start()
+
+    return (thread)
+
+def sedang_diunduh(url):
+    with _kunci_prefetch:
+        return (url in _sedang_diunduh)
+
+# Gambar sebagai data URI base64 (tanpa request tambahan dari browser), di-cache per versi file
+@functools.lru_cache(maxsize = 16)
+def _data_uri(path, waktu_ubah, ukuran):
+    jenis = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    return (f'data:{jenis};base64,{base64.b64encode(Path(path).read_bytes()).decode()}')
+
+def data_uri(path):
+    info = Path(path).stat()
+
+    return (_data_uri(str(path), info.st_mtime_ns, info.st_size))
+
+# Sumber gambar untuk tag <img>: file lokal/cache di-inline, jika belum tersedia pakai URL-nya langsung
+# (diunduh oleh browser, server tetap tidak menunggu jaringan)
+def sumber_gambar(path_lokal, url = None, dir_cache = DIR_CACHE_ASET):
+    path = cari_aset(path_lokal, url, dir_cache)
+    if path is not None:
+        return (data_uri(path))
+
+    mulai_prefetch([url], dir_cache = dir_cache)
+
+    return (url)
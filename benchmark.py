@@ -0,0 +1,372 @@
+# Benchmark dashboard churn
+#
+#   python benchmark.py startup [--ulang 5] [--output hasil.json]
+#   python benchmark.py pipeline [--baris 10000 1000000 10000000] [--dir-data .benchmark] [--output hasil.json]
+#
+# Tiap pengukuran dijalankan di proses Python baru agar yang terukur benar-benar cold start
+# (waktu import, waktu render pertama dan RSS puncak proses). Hasil ditulis sebagai JSON
+# sehingga bisa dibandingkan antar commit.
+#
+# Mode pipeline membuat data sintetis dengan skema 38 kolom yang sama seperti telecom_customer_churn.csv,
+# lalu mengukur waktu & memori tiap tahap (load, kubus, perhitungan, grafik, filter demografi)
+from pathlib import Path
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+PATH_APP = Path(__file__).resolve().with_name('portofolio.py')
+
+# RSS puncak proses ini dalam MB (ru_maxrss di Linux dalam KB, di macOS dalam byte)
+def rss_puncak_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return (rss / 2**20 if sys.platform == 'darwin' else rss / 2**10)
+
+# RSS proses saat ini dalam MB (hanya tersedia di Linux)
+def rss_sekarang_mb():
+    try:
+        with open('/proc/self/statm') as file:
+            return (int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20)
+    except OSError:
+        return (None)
+
+# Waktu import satu modul (dijalankan di proses baru)
+def ukur_import(nama_modul):
+    mulai = time.perf_counter()
+    importlib.import_module(nama_modul)
+
+    return ({
+        'waktu_detik' : time.perf_counter() - mulai,
+        'rss_puncak_mb' : rss_puncak_mb()
+    })
+
+# Waktu render pertama seluruh halaman lewat test runner Streamlit (dijalankan di proses baru)
+def ukur_render_pertama():
+    from streamlit.testing.v1 import AppTest
+
+    mulai = time.perf_counter()
+    app = AppTest.from_file(str(PATH_APP), default_timeout = 600)
+    app.run()
+
+    return ({
+        'waktu_detik' : time.perf_counter() - mulai,
+        'rss_puncak_mb' : rss_puncak_mb(),
+        'error' : [str(error.value) for error in app.exception]
+    })
+
+# Jalankan satu pengukuran di proses Python baru dan ambil hasil JSON-nya
+def jalankan_terpisah(*argumen, env = None):
+    hasil = subprocess.run(
+        [sys.executable, __file__, '_ukur', *argumen],
+        capture_output = True,
+        text = True,
+        check = True,
+        env = env
+    )
+
+    return (json.loads(hasil.stdout.strip().splitlines()[-1]))
+
+# Ringkas beberapa kali pengulangan: median waktu dan RSS puncak maksimum
+def ringkas(daftar_hasil):
+    return ({
+        'waktu_median_detik' : statistics.median(hasil['waktu_detik'] for hasil in daftar_hasil),
+        'waktu_min_detik' : min(hasil['waktu_detik'] for hasil in daftar_hasil),
+        'rss_puncak_mb' : max(hasil['rss_puncak_mb'] for hasil in daftar_hasil),
+        'ulang' : len(daftar_hasil)
+    })
+
+# Environment proses ukur dengan folder snapshot & artifact model sendiri
+def env_snapshot(dir_snapshot):
+    return (dict(
+        os.environ,
+        CHURN_SNAPSHOT_DIR = dir_snapshot,
+        CHURN_MODEL_PATH = str(Path(dir_snapshot) / 'model_churn.npz')
+    ))
+
+def benchmark_startup(ulang):
+    hasil = {
+        # Modul perhitungan harus tetap ringan dan bisa diimport tanpa Streamlit
+        'import_perhitungan' : ringkas([jalankan_terpisah('import', 'perhitungan') for _ in range(ulang)]),
+        'import_portofolio' : ringkas([jalankan_terpisah('import', 'portofolio') for _ in range(ulang)]),
+    }
+
+    # Render pertama tidak memakai snapshot / model milik pemanggil, supaya hasil bisa dibandingkan antar run:
+    # dingin = folder snapshot & path model baru tiap run (parse CSV + latih model),
+    # hangat = folder yang sudah diisi satu render pemanasan (snapshot di-mmap, model dimuat dari file)
+    render_dingin = []
+    for _ in range(ulang):
+        with tempfile.TemporaryDirectory() as dir_snapshot:
+            render_dingin.append(jalankan_terpisah('render', env = env_snapshot(dir_snapshot)))
+
+    with tempfile.TemporaryDirectory() as dir_snapshot:
+        jalankan_terpisah('render', env = env_snapshot(dir_snapshot))
+        render_hangat = [jalankan_terpisah('render', env = env_snapshot(dir_snapshot)) for _ in range(ulang)]
+
+    for nama, render in [('render_pertama_dingin', render_dingin), ('render_pertama_hangat', render_hangat)]:
+        hasil[nama] = ringkas(render)
+        hasil[nama]['error'] = sorted({error for item in render for error in item['error']})
+
+    return (hasil)
+
+# Nilai kategori data sintetis (sesuai nilai pada dataset asli)
+ALASAN_CHURN = {
+    'Competitor' : ['Competitor had better devices', 'Competitor made better offer', 'Competitor offered higher download speeds', 'Competitor offered more data'],
+    'Dissatisfaction' : ['Product dissatisfaction', 'Network reliability', 'Limited range of services', 'Service dissatisfaction',
+                         'Lack of self-service on Website', 'Poor expertise of online support', 'Poor expertise of phone support'],
+    'Attitude' : ['Attitude of service provider', 'Attitude of support person'],
+    'Price' : ['Long distance charges', 'Lack of affordable download/upload speed', 'Price too high', 'Extra data charges'],
+    'Other' : ["Don't know", 'Deceased', 'Moved']
+}
+KOLOM_LAYANAN_INTERNET = [
+    'Online Security', 'Online Backup', 'Device Protection Plan', 'Premium Tech Support',
+    'Streaming TV', 'Streaming Movies', 'Streaming Music', 'Unlimited Data'
+]
+JUMLAH_KOTA = 1100
+
+# Satu potong data sintetis (kolom & urutan sama dengan CSV asli), baris ke-awal s.d. awal + jumlah_baris
+def data_sintetis(awal, jumlah_baris, seed = 0):
+    rng = np.random.default_rng([seed, awal])
+    n = jumlah_baris
+
+    def pilih(nilai, p = None):
+        return (np.asarray(nilai, dtype = object)[rng.choice(len(nilai), size = n, p = p)])
+
+    def kosongkan(nilai, mask):
+        nilai = pd.Series(nilai, dtype = object)
+        nilai[mask] = None
+        return (nilai)
+
+    phone_service = rng.random(n) < 0.9
+    internet_service = rng.random(n) < 0.78
+    tenure = rng.integers(1, 73, n)
+    monthly_charge = np.round(rng.uniform(18, 119, n), 2)
+    total_charges = np.round(monthly_charge * tenure, 2)
+    total_refunds = np.where(rng.random(n) < 0.07, np.round(rng.uniform(0, 50, n), 2), 0)
+    total_extra = np.where(rng.random(n) < 0.1, rng.integers(1, 16, n) * 10, 0)
+    avg_long_distance = np.round(rng.uniform(1, 50, n), 2)
+    total_long_distance = np.where(phone_service, np.round(avg_long_distance * tenure, 2), 0)
+
+    status = pilih(['Stayed', 'Churned', 'Joined'], p = [0.67, 0.265, 0.065])
+    churned = status == 'Churned'
+
+    # Alasan churn dipilih acak di dalam kategorinya
+    daftar_kategori = list(ALASAN_CHURN)
+    kode_kategori = rng.choice(len(daftar_kategori), size = n, p = [0.45, 0.17, 0.17, 0.11, 0.10])
+    jumlah_alasan = np.array([len(ALASAN_CHURN[k]) for k in daftar_kategori])
+    awal_alasan = np.concatenate([[0], np.cumsum(jumlah_alasan)[:-1]])
+    semua_alasan = np.array([a for k in daftar_kategori for a in ALASAN_CHURN[k]], dtype = object)
+    kategori = np.asarray(daftar_kategori, dtype = object)[kode_kategori]
+    alasan = semua_alasan[awal_alasan[kode_kategori] + rng.integers(0, 420, n) % jumlah_alasan[kode_kategori]]
+
+    data = {
+        'Customer ID' : np.char.add(np.char.zfill(np.arange(awal, awal + n).astype(str), 9), '-SYN'),
+        'Gender' : pilih(['Male', 'Female']),
+        'Age' : rng.integers(19, 81, n),
+        'Married' : pilih(['Yes', 'No']),
+        'Number of Dependents' : np.where(rng.random(n) < 0.77, 0, rng.integers(1, 10, n)),
+        'City' : np.char.add('City ', rng.integers(0, JUMLAH_KOTA, n).astype(str)),
+        'Zip Code' : rng.integers(90001, 96151, n),
+        'Latitude' : np.round(rng.uniform(32.5, 42, n), 6),
+        'Longitude' : np.round(rng.uniform(-124.3, -114.2, n), 6),
+        'Number of Referrals' : rng.integers(0, 12, n),
+        'Tenure in Months' : tenure,
+        'Offer' : kosongkan(pilih(['Offer A', 'Offer B', 'Offer C', 'Offer D', 'Offer E']), rng.random(n) < 0.55),
+        'Phone Service' : np.where(phone_service, 'Yes', 'No'),
+        'Avg Monthly Long Distance Charges' : np.where(phone_service, avg_long_distance, np.nan),
+        'Multiple Lines' : kosongkan(pilih(['Yes', 'No']), ~phone_service),
+        'Internet Service' : np.where(internet_service, 'Yes', 'No'),
+        'Internet Type' : kosongkan(pilih(['Fiber Optic', 'Cable', 'DSL'], p = [0.55, 0.15, 0.30]), ~internet_service),
+        'Avg Monthly GB Download' : np.where(internet_service, rng.integers(2, 86, n), np.nan),
+    }
+    for kolom in KOLOM_LAYANAN_INTERNET:
+        data[kolom] = kosongkan(pilih(['Yes', 'No']), ~internet_service)
+    data.update({
+        'Contract' : pilih(['Month-to-Month', 'One Year', 'Two Year'], p = [0.51, 0.21, 0.28]),
+        'Paperless Billing' : pilih(['Yes', 'No']),
+        'Payment Method' : pilih(['Bank Withdrawal', 'Credit Card', 'Mailed Check'], p = [0.55, 0.39, 0.06]),
+        'Monthly Charge' : monthly_charge,
+        'Total Charges' : total_charges,
+        'Total Refunds' : total_refunds,
+        'Total Extra Data Charges' : total_extra,
+        'Total Long Distance Charges' : total_long_distance,
+        'Total Revenue' : np.round(total_charges - total_refunds + total_extra + total_long_distance, 2),
+        'Customer Status' : status,
+        'Churn Category' : kosongkan(kategori, ~churned),
+        'Churn Reason' : kosongkan(alasan, ~churned)
+    })
+
+    return (pd.DataFrame(data))
+
+# Tulis CSV sintetis per potong agar memori tetap kecil; file yang sudah ada dipakai ulang
+def tulis_data_sintetis(dir_data, jumlah_baris, seed = 0, ukuran_potong = 500_000):
+    path = Path(dir_data) / f'churn_sintetis_{jumlah_baris}_{seed}.csv'
+    if path.exists():
+        return (path)
+
+    path.parent.mkdir(parents = True, exist_ok = True)
+    path_sementara = path.with_suffix('.tmp')
+    for awal in range(0, jumlah_baris, ukuran_potong):
+        potong = data_sintetis(awal, min(ukuran_potong, jumlah_baris - awal), seed = seed)
+        potong.to_csv(path_sementara, mode = 'w' if awal == 0 else 'a', header = awal == 0, index = False)
+    path_sementara.replace(path)
+
+    return (path)
+
+# Ukur satu tahap: waktu, RSS setelah tahap dan RSS puncak proses sejauh ini
+def ukur_tahap(daftar_tahap, nama, fungsi, *args, **kwargs):
+    mulai = time.perf_counter()
+    hasil = fungsi(*args, **kwargs)
+
+    daftar_tahap.append({
+        'tahap' : nama,
+        'waktu_detik' : time.perf_counter() - mulai,
+        'rss_mb' : rss_sekarang_mb(),
+        'rss_puncak_mb' : rss_puncak_mb()
+    })
+
+    return (hasil)
+
+# Seluruh tahap pipeline dashboard untuk satu file sumber (dijalankan di proses baru)
+def ukur_pipeline(path):
+    from dataset import UKURAN_CHUNK_BAWAAN, indeks_urut
+    from agregasi import bangun_kubus_bertahap, histogram_umur
+    from inkremental import muat_keadaan
+    import perhitungan
+
+    path = Path(path)
+    tahap = []
+    male_color, female_color = '#fbe280', '#5bbc95'
+
+    # Load pertama parse CSV & tulis snapshot, load kedua membaca snapshot
+    keadaan = ukur_tahap(tahap, 'ekstrak_data', muat_keadaan, path)
+    ukur_tahap(tahap, 'ekstrak_data (snapshot)', muat_keadaan, path)
+    kubus = keadaan['kubus']
+
+    ukur_tahap(tahap, 'bangun_kubus_bertahap', bangun_kubus_bertahap, path, UKURAN_CHUNK_BAWAAN)
+    ukur_tahap(tahap, 'indeks_urut', indeks_urut, keadaan['data'], 'total_revenue')
+
+    # Import plotly (sekali per proses) dicatat sebagai tahap sendiri, bukan dibebankan ke perhitungan pertama
+    ukur_tahap(tahap, 'import plotly', importlib.import_module, 'plotly.express')
+
+    # Perhitungan diukur dengan cache grafik kosong (termasuk pembuatan grafik)
+    for nama, fungsi in [
+        ('perhitungan_customer_status', perhitungan.perhitungan_customer_status),
+        ('perhitungan_churn_reason', perhitungan.perhitungan_churn_reason),
+        ('perhitungan_revenue_impact', perhitungan.perhitungan_revenue_impact),
+        ('histogram_umur', histogram_umur)
+    ]:
+        perhitungan.hapus_cache_grafik()
+        ukur_tahap(tahap, nama, fungsi, kubus)
+    hist_umur = histogram_umur(kubus)
+
+    # Tiap pembuat grafik: sekali dari awal, sekali dari cache grafik
+    cust_status = perhitungan.perhitungan_customer_status(kubus)[0]
+    alasan_churn = perhitungan.perhitungan_churn_reason(kubus)[0]
+    for nama, fungsi, args in [
+        ('grafik_customer_status', perhitungan.grafik_customer_status, (cust_status, )),
+        ('grafik_churn_reason', perhitungan.grafik_churn_reason, (alasan_churn, )),
+        ('distribusi_umur', perhitungan.distribusi_umur, (hist_umur, ('Stayed', ), 'Male', male_color)),
+        ('married_status', perhitungan.married_status, (kubus, 'Male', ('#bfac60', male_color))),
+        ('contract_type', perhitungan.contract_type, (kubus, 'Male'))
+    ]:
+        perhitungan.hapus_cache_grafik()
+        ukur_tahap(tahap, nama, fungsi, *args)
+        if not nama.startswith('grafik_'):
+            ukur_tahap(tahap, f'{nama} (cache)', fungsi, *args)
+
+    # Filter demografi untuk pilihan status di dashboard
+    perhitungan.hapus_cache_grafik()
+    for status in [('Stayed', ), ('Churned', 'Joined'), ('Churned', 'Joined', 'Stayed')]:
+        ukur_tahap(
+            tahap, f"perhitungan_demografi ({', '.join(status)})",
+            perhitungan.perhitungan_demografi, kubus, status, male_color, female_color, hist_umur = hist_umur
+        )
+
+    return ({
+        'jumlah_baris' : len(keadaan['data']),
+        'ukuran_file_mb' : path.stat().st_size / 2**20,
+        'tahap' : tahap
+    })
+
+# Jalankan pipeline untuk tiap ukuran data, masing-masing di proses baru dengan folder snapshot kosong
+# Ukuran yang gagal (mis. kehabisan memori) dicatat sebagai error, ukuran berikutnya tetap dijalankan
+def benchmark_pipeline(daftar_baris, dir_data, seed):
+    hasil = {}
+    for jumlah_baris in daftar_baris:
+        mulai = time.perf_counter()
+        path = tulis_data_sintetis(dir_data, jumlah_baris, seed = seed)
+        waktu_generate = time.perf_counter() - mulai
+
+        with tempfile.TemporaryDirectory() as dir_snapshot:
+            env = env_snapshot(dir_snapshot)
+            try:
+                hasil[str(jumlah_baris)] = jalankan_terpisah('pipeline', str(path), env = env)
+            except subprocess.CalledProcessError as error:
+                hasil[str(jumlah_baris)] = {
+                    'error' : (error.stderr or '').strip().splitlines()[-1:] or [f'exit code {error.returncode}']
+                }
+        hasil[str(jumlah_baris)]['waktu_generate_detik'] = waktu_generate
+
+    return (hasil)
+
+def info_lingkungan():
+    return ({
+        'python' : platform.python_version(),
+        'platform' : platform.platform(),
+        'waktu' : time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    })
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Benchmark dashboard churn')
+    sub = parser.add_subparsers(dest = 'perintah', required = True)
+
+    parser_startup = sub.add_parser('startup', help = 'waktu import, render pertama dan RSS puncak')
+    parser_startup.add_argument('--ulang', type = int, default = 3)
+    parser_startup.add_argument('--output', type = Path)
+
+    parser_pipeline = sub.add_parser('pipeline', help = 'waktu & memori tiap tahap pada data sintetis')
+    parser_pipeline.add_argument('--baris', type = int, nargs = '+', default = [10_000, 1_000_000, 10_000_000])
+    parser_pipeline.add_argument('--dir-data', type = Path, default = Path('.benchmark'))
+    parser_pipeline.add_argument('--seed', type = int, default = 0)
+    parser_pipeline.add_argument('--output', type = Path)
+
+    parser_ukur = sub.add_parser('_ukur')
+    parser_ukur.add_argument('jenis', choices = ['import', 'render', 'pipeline'])
+    parser_ukur.add_argument('target', nargs = '?')
+
+    args = parser.parse_args(argv)
+
+    if args.perintah == '_ukur':
+        if args.jenis == 'import':
+            hasil = ukur_import(args.target)
+        elif args.jenis == 'pipeline':
+            hasil = ukur_pipeline(args.target)
+        else:
+            hasil = ukur_render_pertama()
+        print(json.dumps(hasil))
+        return
+
+    hasil = {'lingkungan' : info_lingkungan()}
+    if args.perintah == 'startup':
+        hasil['startup'] = benchmark_startup(args.ulang)
+    else:
+        hasil['pipeline'] = benchmark_pipeline(args.baris, args.dir_data, args.seed)
+    teks = json.dumps(hasil, indent = 2)
+
+    if args.output:
+        args.output.write_text(teks)
+    print(teks)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,403 @@
+from pathlib import Path
+import glob
+import hashlib
+import json
+import io
+import os
+import re
+
+import pyarrow.dataset as pa_dataset
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import pandas as pd
+import numpy as np
+
+import aset
+
+# Lokasi data: file lokal di repo lebih diutamakan, URL GitHub hanya sebagai cadangan
+PATH_DATA_LOKAL = Path(os.environ.get('CHURN_DATA_PATH', Path(__file__).resolve().with_name('telecom_customer_churn.csv')))
+URL_DATA = os.environ.get(
+    'CHURN_DATA_URL',
+    'https://raw.githubusercontent.com/hafizakhyar/customer-churn-telco/main/telecom_customer_churn.csv'
+)
+
+# Mode streaming: jika diisi, data dibaca per chunk sebanyak ini baris dan hanya agregatnya yang disimpan
+UKURAN_CHUNK = int(os.environ.get('CHURN_UKURAN_CHUNK', 0)) or None
+
+# Ukuran chunk pembacaan bertahap di luar mode streaming (laporan, backend SQL, benchmark)
+UKURAN_CHUNK_BAWAAN = UKURAN_CHUNK or 200_000
+
+# Ukuran tiap partisi (byte) saat file CSV dibagi untuk diproses paralel
+UKURAN_PARTISI = int(os.environ.get('CHURN_UKURAN_PARTISI', 64 << 20))
+
+# Folder snapshot Arrow IPC hasil parsing CSV
+DIR_SNAPSHOT = Path(os.environ.get('CHURN_SNAPSHOT_DIR', PATH_DATA_LOKAL.parent / '.snapshot'))
+
+# Naikkan jika langkah cleansing berubah supaya snapshot lama tidak dipakai lagi
+VERSI_CLEANSING = 4
+
+# Kolom yang tidak dipakai di dashboard, tidak perlu di-parse sama sekali
+KOLOM_DROP = ['Zip Code', 'Latitude', 'Longitude']
+
+# Codebook bersama kolom Yes/No: tiap nilai disimpan sebagai kode int8 (No = 0, Yes = 1, kosong = -1)
+# Kategorinya tetap di semua chunk, partisi dan snapshot, sehingga kode bisa langsung dibandingkan
+# dan hasil gabungan antar chunk tidak berubah menjadi kolom object
+KODE_YA_TIDAK = pd.CategoricalDtype(['No', 'Yes'])
+
+# Kolom Yes/No yang memakai codebook bersama di SKEMA_DTYPE
+KOLOM_YA_TIDAK = [
+    'Married', 'Phone Service', 'Multiple Lines', 'Internet Service', 'Online Security', 'Online Backup',
+    'Device Protection Plan', 'Premium Tech Support', 'Streaming TV', 'Streaming Movies', 'Streaming Music',
+    'Unlimited Data', 'Paperless Billing'
+]
+
+# Skema tipe data per kolom (nama kolom asli pada CSV)
+# Enum disimpan sebagai category, angka kecil memakai integer ringkas, kolom Yes/No memakai codebook bersama
+SKEMA_DTYPE = {
+    'Customer ID' : 'string',
+    'Gender' : 'category',
+    'Age' : 'int8',
+    'Number of Dependents' : 'int8',
+    'City' : 'category',
+    'Number of Referrals' : 'int8',
+    'Tenure in Months' : 'int8',
+    'Offer' : 'category',
+    'Avg Monthly Long Distance Charges' : 'float64',
+    'Internet Type' : 'category',
+    'Avg Monthly GB Download' : 'float32',
+    'Contract' : 'category',
+    'Payment Method' : 'category',
+    'Monthly Charge' : 'float64',
+    'Total Charges' : 'float64',
+    'Total Refunds' : 'float64',
+    'Total Extra Data Charges' : 'int32',
+    'Total Long Distance Charges' : 'float64',
+    'Total Revenue' : 'float64',
+    'Customer Status' : 'category',
+    'Churn Category' : 'category',
+    'Churn Reason' : 'category',
+}
+SKEMA_DTYPE.update({kolom : KODE_YA_TIDAK for kolom in KOLOM_YA_TIDAK})
+
+# Nilai pengganti data kosong, diterapkan sekali saat load (bukan setiap kali difilter/digambar)
+NILAI_KOSONG = {
+    'internet_type' : 'No Internet Service'
+}
+
+# Transformasi nama kolom menjadi lowercase dan spasi menjadi underscore
+def normalisasi_kolom(kolom):
+    return (kolom.lower().replace(' ', '_'))
+
+# File lokal, lalu hasil unduhan URL cadangan di cache aset, baru URL-nya langsung
+def sumber_data(path_lokal = PATH_DATA_LOKAL, url_cadangan = URL_DATA):
+    if path_lokal is not None and Path(path_lokal).exists():
+        return (Path(path_lokal))
+    path_cache = aset.cari_aset(None, url_cadangan)
+    if path_cache is not None:
+        return (path_cache)
+
+    return (url_cadangan)
+
+# Isi data kosong dengan NILAI_KOSONG (kolom category ditambah kategorinya lebih dulu)
+def normalisasi_data(data):
+    for kolom, nilai in NILAI_KOSONG.items():
+        if kolom not in data.columns:
+            continue
+        if isinstance(data[kolom].dtype, pd.CategoricalDtype) and nilai not in data[kolom].cat.categories:
+            data[kolom] = data[kolom].cat.add_categories(nilai)
+        data[kolom] = data[kolom].fillna(nilai)
+
+    return (data)
+
+# Tipe data Parquet mengikuti tipe yang tersimpan di file, disamakan dengan SKEMA_DTYPE
+# agar chunk Parquet & CSV punya tipe yang sama (category, codebook Yes/No, integer ringkas)
+TIPE_KOLOM = {normalisasi_kolom(nama) : tipe for nama, tipe in SKEMA_DTYPE.items()}
+
+def samakan_tipe(data):
+    return (data.astype({kolom : TIPE_KOLOM[kolom] for kolom in data.columns if kolom in TIPE_KOLOM}))
+
+# Baca CSV dengan skema eksplisit, tanpa kolom yang di-drop dan tanpa copy tambahan
+def baca_csv(sumber):
+    data = pd.read_csv(
+        sumber,
+        usecols = list(SKEMA_DTYPE),
+        dtype = SKEMA_DTYPE
+    )
+
+    data.columns = [normalisasi_kolom(kolom) for kolom in data.columns]
+
+    return (normalisasi_data(data))
+
+# Baca seluruh file / folder dataset Parquet (tanpa kolom yang di-drop) dengan tipe yang sama seperti CSV
+def baca_parquet(sumber):
+    dataset_parquet = pa_dataset.dataset(sumber, format = 'parquet')
+    data = dataset_parquet.to_table(
+        columns = [nama for nama in dataset_parquet.schema.names if nama not in KOLOM_DROP]
+    ).to_pandas()
+
+    data.columns = [normalisasi_kolom(kolom) for kolom in data.columns]
+
+    return (normalisasi_data(samakan_tipe(data)))
+
+# Indeks posisi baris yang sudah terurut menurut satu kolom (nilai kosong selalu di akhir)
+def indeks_urut(data, kolom, naik = True):
+    urutan = data[kolom].reset_index(drop = True).sort_values(
+        ascending = naik,
+        kind = 'stable',
+        na_position = 'last'
+    )
+
+    return (hanya_baca(urutan.index.to_numpy()))
+
+# Ambil satu halaman baris dari indeks urut, mask (opsional) menyaring baris yang ikut
+# Mengembalikan potongan data halaman tersebut dan jumlah baris setelah disaring
+def halaman_data(data, urutan, halaman, ukuran_halaman, mask = None):
+    if mask is not None:
+        urutan = urutan[mask[urutan]]
+
+    awal = (halaman - 1) * ukuran_halaman
+
+    return (data.iloc[urutan[awal:awal + ukuran_halaman]], len(urutan))
+
+# Baca sumber secara bertahap (chunk CSV atau batch Parquet) hanya untuk kolom yang diminta
+# Memori dibatasi ukuran chunk, bukan ukuran dataset
+def baca_bertahap(sumber, ukuran_chunk, kolom = None):
+    if sumber_parquet(sumber):
+        dataset_parquet = pa_dataset.dataset(sumber, format = 'parquet')
+        kolom_asli = [
+            nama for nama in dataset_parquet.schema.names
+            if (kolom is None and nama not in KOLOM_DROP) or (kolom is not None and normalisasi_kolom(nama) in kolom)
+        ]
+
+        for batch in dataset_parquet.to_batches(columns = kolom_asli, batch_size = ukuran_chunk):
+            chunk = batch.to_pandas()
+            chunk.columns = [normalisasi_kolom(nama) for nama in chunk.columns]
+            yield normalisasi_data(samakan_tipe(chunk))
+
+        return
+
+    kolom_asli = [nama for nama in SKEMA_DTYPE if kolom is None or normalisasi_kolom(nama) in kolom]
+    for chunk in pd.read_csv(sumber, usecols = kolom_asli, dtype = SKEMA_DTYPE, chunksize = ukuran_chunk):
+        chunk.columns = [normalisasi_kolom(nama) for nama in chunk.columns]
+        yield normalisasi_data(chunk)
+
+# Sumber berupa file Parquet atau folder dataset Parquet
+def sumber_parquet(sumber):
+    return (isinstance(sumber, Path) and (sumber.is_dir() or sumber.suffix == '.parquet'))
+
+# Bagi sumber menjadi partisi yang bisa dibaca terpisah oleh tiap worker:
+# row group untuk Parquet, rentang byte (dipotong di awal baris) untuk CSV
+# Pembagian CSV mengasumsikan tidak ada newline di dalam nilai yang di-quote
+def partisi_sumber(sumber, ukuran_partisi = UKURAN_PARTISI):
+    if sumber_parquet(sumber):
+        dataset_parquet = pa_dataset.dataset(sumber, format = 'parquet')
+
+        return ([
+            ('parquet', fragmen.path, row_group.id)
+            for fragmen in dataset_parquet.get_fragments()
+            for row_group in fragmen.row_groups
+        ])
+
+    ukuran_file = sumber.stat().st_size
+    with open(sumber, 'rb') as file:
+        file.readline()
+        batas = [file.tell()]
+
+        while batas[-1] < ukuran_file:
+            file.seek(min(batas[-1] + ukuran_partisi, ukuran_file) - 1)
+            file.readline()
+            batas.append(min(file.tell(), ukuran_file))
+
+    return ([('csv', str(sumber), awal, akhir) for awal, akhir in zip(batas, batas[1:])])
+
+# Baca satu partisi hasil partisi_sumber (hanya kolom yang diminta)
+def baca_partisi(partisi, kolom = None):
+    if partisi[0] == 'parquet':
+        _, path, row_group = partisi
+        file_parquet = pq.ParquetFile(path)
+        kolom_asli = [
+            nama for nama in file_parquet.schema_arrow.names
+            if (kolom is None and nama not in KOLOM_DROP) or (kolom is not None and normalisasi_kolom(nama) in kolom)
+        ]
+        chunk = file_parquet.read_row_group(row_group, columns = kolom_asli).to_pandas()
+    else:
+        _, path, awal, akhir = partisi
+        header = pd.read_csv(path, nrows = 0).columns
+        with open(path, 'rb') as file:
+            file.seek(awal)
+            isi = file.read(akhir - awal)
+
+        chunk = pd.read_csv(
+            io.BytesIO(isi),
+            header = None,
+            names = header,
+            usecols = [nama for nama in SKEMA_DTYPE if kolom is None or normalisasi_kolom(nama) in kolom],
+            dtype = SKEMA_DTYPE
+        )
+
+    chunk.columns = [normalisasi_kolom(nama) for nama in chunk.columns]
+
+    return (normalisasi_data(samakan_tipe(chunk)))
+
+# Token versi murah (ukuran + waktu modifikasi) untuk sumber yang terlalu besar untuk di-hash
+def token_sumber(sumber):
+    if not isinstance(sumber, Path):
+        return (str(sumber))
+
+    info = sumber.stat()
+
+    return (f'{sumber}:{info.st_size}:{info.st_mtime_ns}')
+
+# Aturan customer_id berulang, sama di semua backend: baris terakhir per customer_id yang dipakai
+# (mis. perubahan status yang ditambahkan di akhir file menggantikan baris lama customer tersebut)
+# Setelah itu customer_id pasti unik dan dicatat sebagai invariant di attrs,
+# sehingga agregasi cukup memakai hitungan baris (size) alih-alih nunique
+def baris_terakhir_per_customer(data):
+    if not data['customer_id'].is_unique:
+        attrs = data.attrs
+        data = data[~data['customer_id'].duplicated(keep = 'last').to_numpy()].reset_index(drop = True)
+        data.attrs = dict(attrs)
+    data.attrs['customer_id_unik'] = True
+
+    return (data)
+
+# Array yang dibagi ke semua sesi dibuat read-only agar tidak bisa diubah di tempat oleh satu sesi
+def hanya_baca(array):
+    array.flags.writeable = False
+
+    return (array)
+
+# Mask boolean per status customer dari kode category, dihitung sekali saat load
+def mask_per_status(data):
+    status = data['customer_status']
+    kode = status.cat.codes.to_numpy()
+
+    return ({kategori : hanya_baca(kode == indeks) for indeks, kategori in enumerate(status.cat.categories)})
+
+# Tampilan data untuk satu sesi: DataFrame baru yang berbagi array kolom dengan data bersama
+# (copy-on-write pandas: perubahan di tampilan hanya menyalin kolom yang diubah, data bersama tetap utuh)
+# Copy-on-write selalu aktif mulai pandas 3 (requirements.txt), di pandas 2 tampilan ini bisa mengubah data bersama
+def tampilan_data(data):
+    return (data.copy(deep = False))
+
+# Gabungkan (OR) mask dari status yang dipilih, tanpa scan ulang kolom string
+def gabung_mask(mask_status, status):
+    hasil = np.zeros(len(next(iter(mask_status.values()), ())), dtype = bool)
+    for nilai in status:
+        hasil |= mask_status[nilai]
+
+    return (hasil)
+
+# Hasher yang sudah berisi skema cleansing
+def hasher_skema():
+    hasher = hashlib.blake2b(digest_size = 16)
+    hasher.update(json.dumps([VERSI_CLEANSING, SKEMA_DTYPE, KOLOM_DROP], sort_keys = True, default = repr).encode())
+
+    return (hasher)
+
+# Hash isi file sumber + skema cleansing, dipakai sebagai kunci snapshot
+# Folder dataset Parquet di-hash dari path relatif & isi tiap file .parquet (urutan tetap)
+def hash_sumber(path, ukuran_blok = 1 << 20):
+    hasher = hasher_skema()
+
+    daftar_file = sorted(Path(path).rglob('*.parquet')) if Path(path).is_dir() else [Path(path)]
+    for path_file in daftar_file:
+        if Path(path).is_dir():
+            hasher.update(path_file.relative_to(path).as_posix().encode())
+        with open(path_file, 'rb') as file:
+            for blok in iter(lambda: file.read(ukuran_blok), b''):
+                hasher.update(blok)
+
+    return (hasher.hexdigest())
+
+# Hash sampai byte ke-offset dan hash seluruh file dalam satu kali baca
+# Jika hash prefix sama dengan versi lama, isi lama tidak berubah dan file hanya bertambah di akhir
+def hash_sumber_bertambah(path, offset, ukuran_blok = 1 << 20):
+    hasher = hasher_skema()
+
+    with open(path, 'rb') as file:
+        sisa = offset
+        while sisa > 0:
+            blok = file.read(min(ukuran_blok, sisa))
+            if not blok:
+                break
+            hasher.update(blok)
+            sisa -= len(blok)
+
+        hash_prefix = hasher.hexdigest()
+
+        for blok in iter(lambda: file.read(ukuran_blok), b''):
+            hasher.update(blok)
+
+    return (hash_prefix, hasher.hexdigest())
+
+# Baca snapshot Arrow IPC secara memory-map
+def baca_snapshot(path_snapshot):
+    return (feather.read_table(path_snapshot, memory_map = True).to_pandas())
+
+# Tulis snapshot secara atomik lalu bersihkan snapshot lama dari sumber yang sama
+def tulis_snapshot(data, path_snapshot):
+    path_snapshot.parent.mkdir(parents = True, exist_ok = True)
+    path_sementara = path_snapshot.with_suffix(f'.{os.getpid()}.tmp')
+
+    feather.write_feather(data, path_sementara, compression = 'uncompressed')
+    os.replace(path_sementara, path_snapshot)
+
+    hapus_versi_lama(path_snapshot)
+
+# Hapus file versi lama dari sumber yang sama: hanya <stem>-<hash 32 hex>.<ext>, sehingga file
+# milik sumber lain yang namanya diawali <stem>- (mis. churn-2025-<hash>.arrow) tidak ikut terhapus
+def hapus_versi_lama(path_baru):
+    prefix = path_baru.name[:-len(path_baru.suffix)].rsplit('-', 1)[0]
+    pola = re.compile(re.escape(prefix) + r'-[0-9a-f]{32}' + re.escape(path_baru.suffix))
+
+    for path_lama in path_baru.parent.glob(f'{glob.escape(prefix)}-*{path_baru.suffix}'):
+        if path_lama != path_baru and pola.fullmatch(path_lama.name):
+            path_lama.unlink(missing_ok = True)
+
+# Gabungkan data lama dan baris tambahan, kolom category digabung kategorinya (union)
+def gabung_data(data, tambahan):
+    tipe = {
+        kolom : pd.CategoricalDtype(data[kolom].cat.categories.union(tambahan[kolom].cat.categories))
+        for kolom in data.columns
+        if isinstance(data[kolom].dtype, pd.CategoricalDtype)
+    }
+
+    gabungan = pd.concat([data.astype(tipe), tambahan.astype(tipe)], ignore_index = True)
+
+    return (gabungan)
+
+# Muat data: snapshot jika masih sesuai dengan sumbernya, selain itu parse CSV dan buat snapshot baru
+def muat_data(sumber, dir_snapshot = DIR_SNAPSHOT):
+    # Sumber remote tidak di-snapshot karena hash-nya butuh download penuh,
+    # token versinya cukup alamat sumbernya
+    if not isinstance(sumber, Path) or dir_snapshot is None:
+        data = baca_csv(sumber)
+        data.attrs['versi'] = str(sumber)
+
+        return (baris_terakhir_per_customer(data))
+
+    versi = hash_sumber(sumber)
+    path_snapshot = Path(dir_snapshot) / f'{sumber.stem}-{versi}.arrow'
+
+    if path_snapshot.is_file():
+        try:
+            data = baca_snapshot(path_snapshot)
+        except (OSError, ValueError):
+            path_snapshot.unlink(missing_ok = True)
+        else:
+            data.attrs['versi'] = versi
+            return (baris_terakhir_per_customer(data))
+
+    # Snapshot sudah berisi satu baris per customer_id
+    data = baris_terakhir_per_customer(baca_parquet(sumber) if sumber_parquet(sumber) else baca_csv(sumber))
+
+    # Gagal menulis snapshot (mis. filesystem read-only) tidak boleh menggagalkan load
+    try:
+        tulis_snapshot(data, path_snapshot)
+    except OSError:
+        pass
+
+    data.attrs['versi'] = versi
+
+    return (data)
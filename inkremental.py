@@ -0,0 +1,100 @@
+from pathlib import Path
+import threading
+
+import numpy as np
+
+from dataset import (
+    muat_data, baca_partisi, hash_sumber, hash_sumber_bertambah, sumber_parquet, gabung_data,
+    baris_terakhir_per_customer, mask_per_status, tulis_snapshot, tampilan_data, DIR_SNAPSHOT
+)
+from agregasi import bangun_kubus, perbarui_kubus, tepi_bin_umur
+
+# Keadaan dataset yang dimuat: data, kubus agregat, mask status, versi dan offset file yang sudah diproses
+def muat_keadaan(sumber):
+    info = sumber.stat() if isinstance(sumber, Path) else None
+    data = muat_data(sumber)
+
+    return ({
+        'sumber' : sumber,
+        'data' : data,
+        'kubus' : bangun_kubus(data),
+        'mask_status' : mask_per_status(data),
+        'versi' : data.attrs['versi'],
+        'offset' : info.st_size if info else None,
+        'mtime' : info.st_mtime_ns if info else None,
+        'kunci' : threading.Lock()
+    })
+
+# Terapkan baris tambahan (delta, sudah satu baris per customer_id) ke keadaan tanpa hitung ulang penuh
+# customer_id yang sudah ada (mis. perubahan status) menggantikan baris lamanya, sama seperti aturan
+# baris terakhir saat load penuh: kontribusi baris lama dikurangi dari kubus lalu baris baru ditambahkan
+def terapkan_delta(keadaan, delta, versi):
+    data = keadaan['data']
+
+    diganti = data['customer_id'].isin(delta['customer_id']).to_numpy()
+    data_baru = gabung_data(data[~diganti], delta)
+    data_baru.attrs.update(versi = versi, customer_id_unik = True)
+
+    # Tepi bin usia berubah (usia baru di luar rentang, atau usia ekstrem hilang karena barisnya diganti):
+    # kubus dibangun ulang dari data di memori
+    tepi_umur = tepi_bin_umur(data_baru['age'])
+    if not np.array_equal(tepi_umur, keadaan['kubus'].attrs['tepi_umur']):
+        kubus_baru = bangun_kubus(data_baru, tepi_umur)
+    else:
+        kubus_baru = perbarui_kubus(keadaan['kubus'], data[diganti], delta)
+
+    keadaan.update(
+        data = data_baru,
+        kubus = kubus_baru,
+        mask_status = mask_per_status(data_baru),
+        versi = versi
+    )
+
+# Baris terakhir file sudah lengkap (diakhiri newline), bukan sedang ditulis
+def baris_lengkap(path, ukuran):
+    with open(path, 'rb') as file:
+        file.seek(ukuran - 1)
+
+        return (file.read(1) == b'\n')
+
+# Cek apakah file sumber berubah sejak dimuat: jika hanya bertambah di akhir, parse delta-nya saja
+# Jika isi lama berubah, muat ulang penuh
+# Mengembalikan salinan isi keadaan yang konsisten untuk dipakai satu kali render
+def perbarui_keadaan(keadaan, dir_snapshot = DIR_SNAPSHOT):
+    with keadaan['kunci']:
+        sumber = keadaan['sumber']
+
+        if isinstance(sumber, Path):
+            info = sumber.stat()
+
+            if (info.st_size, info.st_mtime_ns) != (keadaan['offset'], keadaan['mtime']) and (sumber_parquet(sumber) or baris_lengkap(sumber, info.st_size)):
+                # Parquet tidak bisa ditambah di akhir seperti CSV, perubahan apa pun dimuat ulang penuh
+                if sumber_parquet(sumber):
+                    hash_prefix, versi = None, hash_sumber(sumber)
+                else:
+                    hash_prefix, versi = hash_sumber_bertambah(sumber, keadaan['offset'])
+
+                if versi == keadaan['versi']:
+                    # Hanya waktu modifikasi yang berubah, isi file sama
+                    pass
+                elif info.st_size > keadaan['offset'] and hash_prefix == keadaan['versi']:
+                    delta = baris_terakhir_per_customer(baca_partisi(('csv', str(sumber), keadaan['offset'], info.st_size)))
+                    terapkan_delta(keadaan, delta, versi)
+
+                    # Snapshot ikut diperbarui supaya restart berikutnya tidak parse ulang CSV
+                    try:
+                        tulis_snapshot(keadaan['data'], Path(dir_snapshot) / f'{sumber.stem}-{versi}.arrow')
+                    except OSError:
+                        pass
+                else:
+                    baru = muat_keadaan(sumber)
+                    baru.pop('kunci')
+                    keadaan.update(baru)
+
+                keadaan.update(offset = info.st_size, mtime = info.st_mtime_ns)
+
+        # Data & kubus bersama tidak pernah diberikan langsung, hanya tampilannya (tanpa salin array)
+        tampilan = {kunci : nilai for kunci, nilai in keadaan.items() if kunci != 'kunci'}
+        tampilan.update(data = tampilan_data(keadaan['data']), kubus = tampilan_data(keadaan['kubus']))
+
+        return (tampilan)
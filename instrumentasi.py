@@ -0,0 +1,136 @@
+# Instrumentasi render dashboard: waktu per section & tahap, cache hit/miss dan jumlah baris
+# Dicatat per rerun (per thread script), tidak bergantung pada Streamlit dan tidak melakukan apa-apa
+# jika tidak ada rerun yang sedang dicatat (mis. saat dipakai dari laporan.py atau benchmark.py)
+from collections import deque
+from contextlib import contextmanager
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+# Catatan tiap rerun juga ditulis sebagai satu baris JSON ke log: ke stderr secara default,
+# ke file ini jika diisi path, atau tidak ditulis sama sekali jika diisi 'off'
+PATH_LOG_INSTRUMENTASI = os.environ.get('CHURN_LOG_INSTRUMENTASI')
+
+# Jumlah rerun terakhir yang disimpan untuk ringkasan persentil
+UKURAN_RIWAYAT = 500
+
+# Handler & level diset di sini karena lastResort logging hanya menampilkan WARNING ke atas
+logger = logging.getLogger('churn.instrumentasi')
+if PATH_LOG_INSTRUMENTASI != 'off':
+    handler = logging.FileHandler(PATH_LOG_INSTRUMENTASI) if PATH_LOG_INSTRUMENTASI else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_lokal = threading.local()
+_riwayat = deque(maxlen = UKURAN_RIWAYAT)
+_kunci_riwayat = threading.Lock()
+
+def catatan_aktif():
+    return (getattr(_lokal, 'catatan', None))
+
+# Mulai mencatat satu rerun
+def mulai_rerun(**info):
+    _lokal.catatan = {
+        'waktu' : time.time(),
+        'info' : info,
+        'mulai' : time.perf_counter(),
+        'ukuran' : [],
+        'cache' : {},
+        'baris' : {},
+        'miss' : set()
+    }
+    _lokal.induk = []
+
+# Ukur waktu satu blok; jenis 'section' untuk fungsi tampilkan_*, 'tahap' untuk langkah di dalamnya
+# Jika cache = True, blok dianggap hit kecuali fungsi yang di-cache memanggil catat_miss(nama)
+@contextmanager
+def ukur(nama, jenis = 'tahap', cache = False):
+    catatan = catatan_aktif()
+    if catatan is None:
+        yield
+        return
+
+    induk = _lokal.induk[-1] if _lokal.induk else None
+    _lokal.induk.append(nama)
+    mulai = time.perf_counter()
+    try:
+        yield
+    finally:
+        _lokal.induk.pop()
+        catatan['ukuran'].append({
+            'nama' : nama,
+            'jenis' : jenis,
+            'induk' : induk,
+            'waktu_detik' : time.perf_counter() - mulai
+        })
+        if cache:
+            catat_cache(nama, hit = nama not in catatan['miss'])
+            catatan['miss'].discard(nama)
+
+# Dipanggil dari dalam fungsi yang di-cache (hanya jalan saat cache miss)
+def catat_miss(nama):
+    catatan = catatan_aktif()
+    if catatan is not None:
+        catatan['miss'].add(nama)
+
+def catat_cache(nama, hit):
+    catatan = catatan_aktif()
+    if catatan is not None:
+        jumlah = catatan['cache'].setdefault(nama, {'hit' : 0, 'miss' : 0})
+        jumlah['hit' if hit else 'miss'] += 1
+
+def catat_baris(nama, jumlah):
+    catatan = catatan_aktif()
+    if catatan is not None:
+        catatan['baris'][nama] = int(jumlah)
+
+# Selesai mencatat rerun: simpan ke riwayat, tulis log JSON dan kembalikan catatannya
+def selesai_rerun():
+    catatan = catatan_aktif()
+    if catatan is None:
+        return (None)
+    _lokal.catatan = None
+
+    hasil = {
+        'waktu' : catatan['waktu'],
+        'info' : catatan['info'],
+        'total_detik' : time.perf_counter() - catatan['mulai'],
+        'ukuran' : catatan['ukuran'],
+        'cache' : catatan['cache'],
+        'baris' : catatan['baris']
+    }
+
+    with _kunci_riwayat:
+        _riwayat.append(hasil)
+    logger.info(json.dumps(hasil, default = str))
+
+    return (hasil)
+
+# Ringkasan p50 / p95 / maks waktu tiap section & tahap dari rerun-rerun terakhir (untuk SLO)
+def ringkasan_riwayat():
+    with _kunci_riwayat:
+        riwayat = list(_riwayat)
+
+    waktu = {}
+    for hasil in riwayat:
+        waktu.setdefault(('rerun', 'total'), []).append(hasil['total_detik'])
+        for ukuran in hasil['ukuran']:
+            waktu.setdefault((ukuran['jenis'], ukuran['nama']), []).append(ukuran['waktu_detik'])
+
+    return ([
+        {
+            'jenis' : jenis,
+            'nama' : nama,
+            'jumlah' : len(nilai),
+            'p50_detik' : float(np.percentile(nilai, 50)),
+            'p95_detik' : float(np.percentile(nilai, 95)),
+            'maks_detik' : max(nilai)
+        }
+        for (jenis, nama), nilai in waktu.items()
+    ])
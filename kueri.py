@@ -0,0 +1,155 @@
+# Backend query untuk membangun kubus agregat langsung di engine SQL embedded (DuckDB / SQLite)
+# atas file lokal, tanpa memuat seluruh data ke memori Python. Backend default tetap pandas.
+# Semua section dashboard dihitung dari kubus, jadi cukup kubusnya yang di-push down ke SQL.
+from pathlib import Path
+import hashlib
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from dataset import (
+    DIR_SNAPSHOT, SKEMA_DTYPE, VERSI_CLEANSING, NILAI_KOSONG, UKURAN_CHUNK_BAWAAN,
+    normalisasi_kolom, sumber_parquet, baca_bertahap, token_sumber, hapus_versi_lama
+)
+from agregasi import DIMENSI_KUBUS, KOLOM_KUBUS, JUMLAH_BIN_UMUR, tepi_bin_umur
+
+# Backend kubus: 'pandas' (default), 'duckdb' atau 'sqlite'
+BACKEND_KUBUS = os.environ.get('CHURN_BACKEND', 'pandas')
+
+BACKEND_SQL = ['duckdb', 'sqlite']
+
+# Nama kolom asli (CSV/Parquet) per nama kolom ternormalisasi
+KOLOM_ASLI = {normalisasi_kolom(nama) : nama for nama in SKEMA_DTYPE}
+
+# Tipe SQL untuk dtype numerik pada SKEMA_DTYPE (selain itu VARCHAR)
+TIPE_SQL = {
+    'int8' : 'INTEGER',
+    'int32' : 'INTEGER',
+    'float32' : 'DOUBLE',
+    'float64' : 'DOUBLE'
+}
+
+def kutip(nama):
+    return ('"' + nama.replace('"', '""') + '"')
+
+def literal(nilai):
+    return ("'" + str(nilai).replace("'", "''") + "'")
+
+# Ekspresi bin usia: sama dengan pd.cut(bins = tepi_umur, include_lowest = True), bin ke-i = (tepi[i], tepi[i + 1]]
+def ekspresi_bin_umur(tepi_umur):
+    kasus = ' '.join(f'WHEN age <= {float(tepi)!r} THEN {indeks}' for indeks, tepi in enumerate(tepi_umur[1:-1]))
+
+    return (f'CASE WHEN age IS NULL THEN NULL {kasus} ELSE {len(tepi_umur) - 2} END')
+
+# Query kubus: satu GROUP BY atas tabel/subquery dengan kolom yang sudah ternormalisasi
+# Tabel sudah satu baris per customer_id (baris_terakhir_sql), jumlah customer = jumlah baris
+def kueri_kubus(tabel, tepi_umur):
+    dimensi = ', '.join(DIMENSI_KUBUS[:-1])
+
+    return (f"""
+        SELECT {dimensi}, {ekspresi_bin_umur(tepi_umur)} AS kelompok_umur,
+            COUNT(*) AS jumlah_customer,
+            SUM(total_revenue) AS total_revenue
+        FROM {tabel}
+        GROUP BY {', '.join(str(nomor) for nomor in range(1, len(DIMENSI_KUBUS) + 1))}
+        """)
+
+# Hasil query menjadi kubus dengan tipe & attrs yang sama seperti bangun_kubus
+def kubus_dari_hasil(hasil, tepi_umur):
+    kubus = hasil.astype({kolom : 'category' for kolom in DIMENSI_KUBUS[:-1]})
+    kubus = kubus.astype({'jumlah_customer' : 'int64', 'total_revenue' : 'float64'})
+    if not kubus['kelompok_umur'].isna().any():
+        kubus['kelompok_umur'] = kubus['kelompok_umur'].astype('int64')
+    kubus.attrs['tepi_umur'] = tuple(np.asarray(tepi_umur).tolist())
+
+    return (kubus)
+
+# Subquery DuckDB atas file sumber: kolom di-rename ke nama ternormalisasi dan data kosong diisi (NILAI_KOSONG)
+def tabel_duckdb(sumber):
+    if sumber_parquet(sumber):
+        pola = str(sumber / '**' / '*.parquet') if sumber.is_dir() else str(sumber)
+        baca = f'read_parquet({literal(pola)})'
+    else:
+        # Semua kolom dibaca sebagai teks (Yes/No tidak ditebak jadi boolean), tipe mengikuti SKEMA_DTYPE
+        baca = f'read_csv({literal(sumber)}, header = true, all_varchar = true)'
+
+    kolom = []
+    for nama in KOLOM_KUBUS:
+        ekspresi = f'CAST({kutip(KOLOM_ASLI[nama])} AS {TIPE_SQL.get(SKEMA_DTYPE[KOLOM_ASLI[nama]], "VARCHAR")})'
+        if nama in NILAI_KOSONG:
+            ekspresi = f'COALESCE({ekspresi}, {literal(NILAI_KOSONG[nama])})'
+        kolom.append(f'{ekspresi} AS {nama}')
+    kolom = ', '.join(kolom)
+
+    return (f'(SELECT {kolom} FROM {baca})')
+
+# Aturan customer_id berulang yang sama dengan load pandas: hanya baris terakhir per customer_id (rowid terbesar)
+def baris_terakhir_sql(tabel):
+    return (f'(SELECT * FROM {tabel} WHERE rowid IN (SELECT MAX(rowid) FROM {tabel} GROUP BY customer_id))')
+
+def bangun_kubus_duckdb(sumber):
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError('backend duckdb membutuhkan paket duckdb (pip install duckdb)')
+
+    tabel = tabel_duckdb(sumber)
+    with duckdb.connect() as koneksi:
+        # customer_id berulang (atau kosong): baris disalin ke tabel sementara sesuai urutan file
+        # (urutan insert dipertahankan DuckDB) agar rowid bisa menentukan baris terakhir
+        jumlah_baris, jumlah_unik = koneksi.execute(f'SELECT COUNT(*), COUNT(DISTINCT customer_id) FROM {tabel}').fetchone()
+        if jumlah_baris != jumlah_unik:
+            koneksi.execute(f'CREATE TEMP TABLE data AS SELECT * FROM {tabel}')
+            tabel = baris_terakhir_sql('data')
+
+        umur_min, umur_max = koneksi.execute(f'SELECT MIN(age), MAX(age) FROM {tabel}').fetchone()
+        tepi_umur = tepi_bin_umur(pd.Series([umur_min, umur_max]), JUMLAH_BIN_UMUR)
+        hasil = koneksi.execute(kueri_kubus(tabel, tepi_umur)).df()
+
+    return (kubus_dari_hasil(hasil, tepi_umur))
+
+# Database SQLite per versi sumber di folder snapshot, diisi per chunk (memori terbatas ukuran chunk)
+# Baris lama dari customer_id yang berulang dihapus sekali saat database dibuat (rowid = urutan file)
+def database_sqlite(sumber, dir_snapshot = DIR_SNAPSHOT, ukuran_chunk = UKURAN_CHUNK_BAWAAN):
+    versi = hashlib.blake2b(f'{VERSI_CLEANSING}:{token_sumber(sumber)}'.encode(), digest_size = 16).hexdigest()
+    path_database = Path(dir_snapshot) / f'{Path(sumber).stem}-{versi}.sqlite'
+
+    if not path_database.is_file():
+        path_database.parent.mkdir(parents = True, exist_ok = True)
+        path_sementara = path_database.with_suffix(f'.{os.getpid()}.tmp')
+        path_sementara.unlink(missing_ok = True)
+
+        with sqlite3.connect(path_sementara) as koneksi:
+            for chunk in baca_bertahap(sumber, ukuran_chunk, KOLOM_KUBUS):
+                chunk.to_sql('data', koneksi, if_exists = 'append', index = False)
+            koneksi.execute('DELETE FROM data WHERE rowid NOT IN (SELECT MAX(rowid) FROM data GROUP BY customer_id)')
+            koneksi.execute('CREATE INDEX IF NOT EXISTS data_status ON data (customer_status)')
+        koneksi.close()
+        os.replace(path_sementara, path_database)
+
+        # Database dari versi sumber yang lama tidak dipakai lagi
+        hapus_versi_lama(path_database)
+
+    return (path_database)
+
+def bangun_kubus_sqlite(sumber, dir_snapshot = DIR_SNAPSHOT):
+    koneksi = sqlite3.connect(database_sqlite(sumber, dir_snapshot))
+    try:
+        umur_min, umur_max = koneksi.execute('SELECT MIN(age), MAX(age) FROM data').fetchone()
+        tepi_umur = tepi_bin_umur(pd.Series([umur_min, umur_max]), JUMLAH_BIN_UMUR)
+        hasil = pd.read_sql_query(kueri_kubus('data', tepi_umur), koneksi)
+    finally:
+        koneksi.close()
+
+    return (kubus_dari_hasil(hasil, tepi_umur))
+
+# Bangun kubus dengan backend SQL yang dipilih (sumber harus file lokal)
+def bangun_kubus_sql(sumber, backend = BACKEND_KUBUS):
+    if backend == 'duckdb':
+        return (bangun_kubus_duckdb(sumber))
+    if backend == 'sqlite':
+        return (bangun_kubus_sqlite(sumber))
+
+    raise ValueError(f'backend kubus tidak dikenal: {backend!r} (pilihan: pandas, {", ".join(BACKEND_SQL)})')
@@ -0,0 +1,220 @@
+# Generator laporan churn tanpa Streamlit (untuk batch malam hari)
+#
+#   python laporan.py data/*.csv --output laporan/ --format html json --jumlah-worker 8
+#
+# Tiap sumber (CSV, file Parquet atau folder dataset Parquet) diagregasi per chunk menjadi kubus,
+# lalu dihitung dengan fungsi yang sama seperti dashboard (modul perhitungan). Hasil per sumber
+# ditulis ke <output>/<nama sumber>/: laporan.json, laporan.html dan/atau grafik *.png
+# (nama folder ditambah hash path sumber jika ada sumber lain dengan nama file yang sama)
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import hashlib
+import html
+import importlib.util
+import json
+import sys
+
+from dataset import UKURAN_CHUNK_BAWAAN
+from agregasi import JUMLAH_WORKER, bangun_kubus_bertahap, histogram_umur
+from kueri import BACKEND_KUBUS, BACKEND_SQL, bangun_kubus_sql
+import perhitungan
+
+FORMAT_LAPORAN = ['html', 'json', 'png']
+
+
+MALE_COLOR, FEMALE_COLOR = '#fbe280', '#5bbc95'
+
+# Nilai numpy/pandas di hasil perhitungan diubah ke tipe Python biasa agar bisa ditulis ke JSON
+def nilai_json(nilai):
+    return (nilai.item() if hasattr(nilai, 'item') else str(nilai))
+
+# Semua angka & grafik laporan untuk satu kubus (grafik berupa JSON figure plotly)
+def hitung_laporan(kubus, top_n = None):
+    cust_status, fig_status = perhitungan.perhitungan_customer_status(kubus)
+    alasan_churn, fig_alasan_churn = perhitungan.perhitungan_churn_reason(kubus, top_n = top_n)
+    revenue_stayed, revenue_joined, revenue_churn = perhitungan.perhitungan_revenue_impact(kubus)
+
+    hist_umur = histogram_umur(kubus)
+    demografi = {}
+    for status in sorted(kubus['customer_status'].dropna().unique()):
+        (
+            count_male_data, count_female_data,
+            fig_hist_male, fig_hist_female,
+            fig_pie_married_male, fig_pie_married_female,
+            fig_treemap_male, fig_treemap_female
+        ) = perhitungan.perhitungan_demografi(kubus, (status, ), MALE_COLOR, FEMALE_COLOR, hist_umur = hist_umur)
+
+        demografi[status] = {
+            'jumlah_customer' : {'Male' : count_male_data, 'Female' : count_female_data},
+            'grafik' : {
+                'distribusi_umur_male' : fig_hist_male,
+                'distribusi_umur_female' : fig_hist_female,
+                'married_male' : fig_pie_married_male,
+                'married_female' : fig_pie_married_female,
+                'contract_male' : fig_treemap_male,
+                'contract_female' : fig_treemap_female
+            }
+        }
+
+    return ({
+        'total_customer' : kubus['jumlah_customer'].sum(),
+        'customer_status' : cust_status.to_dict(orient = 'records'),
+        'alasan_churn' : alasan_churn.drop(columns = ['index_largest', 'text']).to_dict(orient = 'records'),
+        'revenue' : {'Stayed' : revenue_stayed, 'Joined' : revenue_joined, 'Churned' : revenue_churn},
+        'tepi_umur' : list(hist_umur.attrs['tepi_umur']),
+        'distribusi_umur' : {
+            f'{status}|{gender}' : jumlah.tolist() for (status, gender), jumlah in zip(hist_umur.index, hist_umur.to_numpy())
+        },
+        'demografi' : demografi,
+        'grafik' : {'customer_status' : fig_status, 'alasan_churn' : fig_alasan_churn}
+    })
+
+# Semua grafik laporan sebagai pasangan (nama, JSON figure)
+def daftar_grafik(laporan):
+    yield from laporan['grafik'].items()
+    for status, isi in laporan['demografi'].items():
+        for nama, spec in isi['grafik'].items():
+            yield (f'{status.lower()}_{nama}', spec)
+
+# Ringkasan laporan tanpa JSON figure
+def ringkasan_laporan(laporan, sumber):
+    ringkasan = {kunci : nilai for kunci, nilai in laporan.items() if kunci != 'grafik'}
+    ringkasan['demografi'] = {status : isi['jumlah_customer'] for status, isi in laporan['demografi'].items()}
+    ringkasan['sumber'] = str(sumber)
+
+    return (ringkasan)
+
+# Halaman HTML statis: tile revenue + grafik yang dirender plotly.js langsung dari JSON figure
+def tulis_html(laporan, sumber, path, plotlyjs_inline = False):
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+    if plotlyjs_inline:
+        script_plotly = f'<script>{get_plotlyjs()}</script>'
+    else:
+        script_plotly = f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>'
+
+    revenue = laporan['revenue']
+    tiles = ''.join(
+        f"<div style='display: inline-block; width: 30%;'>"
+        f"{perhitungan.kpi_tile(label, '&#36; ' + str(round(revenue[status] / 10**6, 2)) + 'M', warna)}</div>"
+        for label, status, warna in [('Stayed', 'Stayed', '#5bb450'), ('Joined', 'Joined', '#5bb450'), ('Churn', 'Churned', '#ff0000')]
+    )
+
+    bagian = []
+    for nomor, (nama, spec) in enumerate(daftar_grafik(laporan)):
+        # '</' di dalam teks grafik tidak boleh menutup tag script
+        spec = spec.replace('</', '<\\/')
+        bagian.append(f"""
+            <h3>{html.escape(nama)}</h3>
+            <div id='grafik-{nomor}'></div>
+            <script>
+                var spec = {spec};
+                Plotly.newPlot('grafik-{nomor}', spec.data, spec.layout);
+            </script>
+            """)
+
+    path.write_text(f"""<!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset='utf-8'>
+            <title>Laporan Churn - {html.escape(str(sumber))}</title>
+            {script_plotly}
+        </head>
+        <body style='font-family: sans-serif;'>
+            <h1>Laporan Customer Churn</h1>
+            <p>Sumber: {html.escape(str(sumber))} ({laporan['total_customer']} customer)</p>
+            <h2>Dampak Terhadap Perusahaan</h2>
+            {tiles}
+            {''.join(bagian)}
+        </body>
+        </html>
+        """, encoding = 'utf-8')
+
+# Ekspor tiap grafik ke PNG (butuh paket kaleido)
+def tulis_png(laporan, dir_laporan):
+    import plotly.io as pio
+
+    for nama, spec in daftar_grafik(laporan):
+        pio.write_image(pio.from_json(spec), dir_laporan / f'{nama}.png')
+
+# Nama folder laporan per sumber: nama file-nya, ditambah hash path lengkap jika ada sumber lain
+# dengan nama file yang sama (mis. jakarta/churn.csv & bandung/churn.csv) agar tidak saling menimpa
+def nama_laporan(daftar_sumber):
+    jumlah_stem = Counter(Path(sumber).stem for sumber in daftar_sumber)
+
+    return ([
+        Path(sumber).stem if jumlah_stem[Path(sumber).stem] == 1
+        else f'{Path(sumber).stem}-{hashlib.blake2b(str(Path(sumber).resolve()).encode(), digest_size = 4).hexdigest()}'
+        for sumber in daftar_sumber
+    ])
+
+# Buat laporan satu sumber, dijalankan di proses worker
+def buat_laporan(sumber, dir_output, format_laporan, top_n = None, ukuran_chunk = UKURAN_CHUNK_BAWAAN, plotlyjs_inline = False, backend = BACKEND_KUBUS, nama = None):
+    if backend != 'pandas':
+        kubus = bangun_kubus_sql(Path(sumber), backend)
+    else:
+        kubus = bangun_kubus_bertahap(sumber, ukuran_chunk)
+    laporan = hitung_laporan(kubus, top_n = top_n)
+
+    dir_laporan = Path(dir_output) / (nama or Path(sumber).stem)
+    dir_laporan.mkdir(parents = True, exist_ok = True)
+
+    if 'json' in format_laporan:
+        (dir_laporan / 'laporan.json').write_text(
+            json.dumps(ringkasan_laporan(laporan, sumber), indent = 2, default = nilai_json),
+            encoding = 'utf-8'
+        )
+    if 'html' in format_laporan:
+        tulis_html(laporan, sumber, dir_laporan / 'laporan.html', plotlyjs_inline = plotlyjs_inline)
+    if 'png' in format_laporan:
+        tulis_png(laporan, dir_laporan)
+
+    return (str(dir_laporan))
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Generator laporan churn (tanpa Streamlit)')
+    parser.add_argument('sumber', nargs = '+', type = Path, help = 'file CSV / Parquet atau folder dataset Parquet')
+    parser.add_argument('--output', type = Path, default = Path('laporan'))
+    parser.add_argument('--format', nargs = '+', choices = FORMAT_LAPORAN, default = ['html', 'json'])
+    parser.add_argument('--jumlah-worker', type = int, default = JUMLAH_WORKER)
+    parser.add_argument('--ukuran-chunk', type = int, default = UKURAN_CHUNK_BAWAAN)
+    parser.add_argument('--backend', choices = ['pandas'] + BACKEND_SQL, default = BACKEND_KUBUS)
+    parser.add_argument('--top-n', type = int, help = 'batasi alasan churn per kategori, sisanya jadi Lainnya')
+    parser.add_argument('--plotlyjs-inline', action = 'store_true', help = 'sertakan plotly.js di HTML agar bisa dibuka offline')
+    args = parser.parse_args(argv)
+
+    if 'png' in args.format and importlib.util.find_spec('kaleido') is None:
+        parser.error('format png membutuhkan paket kaleido (pip install kaleido)')
+
+    # Sumber yang disebut dua kali cukup dibuat sekali (tidak menulis folder yang sama bersamaan)
+    args.sumber = list(dict.fromkeys(sumber.resolve() for sumber in args.sumber))
+
+    argumen = dict(
+        dir_output = args.output,
+        format_laporan = args.format,
+        top_n = args.top_n,
+        ukuran_chunk = args.ukuran_chunk,
+        plotlyjs_inline = args.plotlyjs_inline,
+        backend = args.backend
+    )
+
+    # Satu sumber gagal tidak menghentikan laporan sumber lainnya
+    gagal = 0
+    with ProcessPoolExecutor(max_workers = max(args.jumlah_worker, 1)) as pool:
+        daftar_tugas = [
+            (sumber, pool.submit(buat_laporan, sumber, nama = nama, **argumen))
+            for sumber, nama in zip(args.sumber, nama_laporan(args.sumber))
+        ]
+        for sumber, tugas in daftar_tugas:
+            try:
+                print(f'{sumber} -> {tugas.result()}')
+            except Exception as error:
+                gagal += 1
+                print(f'{sumber} gagal: {error!r}', file = sys.stderr)
+
+    return (1 if gagal else 0)
+
+if __name__ == '__main__':
+    sys.exit(main())
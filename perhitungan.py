@@ -0,0 +1,510 @@
+# Perhitungan dan pembuatan grafik tiap section dashboard, bisa diimport tanpa Streamlit
+# plotly.express baru diimport saat grafiknya dibuat
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from agregasi import iris_kubus, peringkat_alasan_churn, histogram_umur
+from revenue import iris_rollup
+import instrumentasi
+
+# Cache grafik dalam bentuk JSON final (hasil serialisasi), key = hash agregat input + parameter gaya
+# Saat hit, plotly.express tidak dijalankan sama sekali
+UKURAN_CACHE_GRAFIK = 64
+_cache_grafik = OrderedDict()
+_kunci_cache_grafik = threading.Lock()
+
+# Hash isi agregat (nama kolom, nilai dan attrs) yang menjadi input grafik
+def hash_agregat(agregat):
+    hasher = hashlib.blake2b(digest_size = 16)
+    hasher.update(json.dumps([list(map(str, agregat.columns)), agregat.attrs], default = str).encode())
+    hasher.update(pd.util.hash_pandas_object(agregat, index = False).to_numpy().tobytes())
+
+    return (hasher.hexdigest())
+
+# Ambil JSON grafik dari cache, atau bangun figure dengan buat_grafik lalu serialisasi
+def grafik_json(buat_grafik, agregat, **gaya):
+    kunci = (buat_grafik.__name__, hash_agregat(agregat), json.dumps(gaya, sort_keys = True, default = str))
+
+    with _kunci_cache_grafik:
+        if kunci in _cache_grafik:
+            _cache_grafik.move_to_end(kunci)
+            instrumentasi.catat_cache('grafik', hit = True)
+            return (_cache_grafik[kunci])
+    instrumentasi.catat_cache('grafik', hit = False)
+
+    import plotly.io as pio
+
+    with instrumentasi.ukur('buat_grafik'):
+        fig = buat_grafik(agregat, **gaya)
+    with instrumentasi.ukur('serialisasi_grafik'):
+        spec = pio.to_json(fig, validate = False)
+
+    with _kunci_cache_grafik:
+        _cache_grafik[kunci] = spec
+        while len(_cache_grafik) > UKURAN_CACHE_GRAFIK:
+            _cache_grafik.popitem(last = False)
+
+    return (spec)
+
+# Kosongkan cache grafik (dipakai benchmark untuk mengukur pembuatan grafik dari awal)
+def hapus_cache_grafik():
+    with _kunci_cache_grafik:
+        _cache_grafik.clear()
+
+# Hitung banyak customer yang dikelompokkan berdasarkan status
+def perhitungan_customer_status(kubus):
+    # Hitung total data (unik) customer id per status customernya
+    cust_status = iris_kubus(kubus, ['customer_status'])
+    cust_status = cust_status[['customer_status', 'jumlah_customer']].rename(columns = {'jumlah_customer' : 'total_cust_status'})
+
+    return (cust_status, grafik_json(grafik_customer_status, cust_status))
+
+# Buat grafik pie
+def grafik_customer_status(cust_status):
+    import plotly.express as px
+
+    fig = px.pie(
+        cust_status, 
+        values = 'total_cust_status', 
+        names = 'customer_status',
+        #hover_data = ['total_cust_status'], 
+        labels = {
+            'customer_status' : 'Customer Status',
+            'total_cust_status' : 'Total Customer'
+        },
+        color = 'customer_status',
+        color_discrete_map = {
+            'Churned' : '#ff0000',
+            'Stayed' : '#5bb450',
+            'Joined' : '#72bf6a'                                 
+        }
+    )
+
+    fig.update_traces(
+        textposition = 'inside', 
+        textinfo = 'percent+label',
+        pull = [0.1, 0, 0]
+    )
+
+
+    fig.update_layout(
+        autosize = False,
+        width = 400,
+        height = 450,
+        showlegend = False,
+        plot_bgcolor = 'rgba(0, 0, 0, 0)',
+        paper_bgcolor = 'rgba(0, 0, 0, 0)'
+    )
+
+    return (fig)
+
+def perhitungan_churn_reason(kubus, top_n = None):
+    # Hitung total data cust per alasan & kategori beserta peringkat alasan di tiap kategori
+    cust_churn_category = peringkat_alasan_churn(kubus, top_n = top_n)
+
+    cust_churn_category['index_largest'] = np.where(cust_churn_category['peringkat'] == 1, 'largest', '')
+    cust_churn_category['text'] = cust_churn_category['churn_reason'].astype(str) + '<br> (' + cust_churn_category['total_cust_churn_per_reason'].astype(str) + ')'
+
+    return (cust_churn_category, grafik_json(grafik_churn_reason, cust_churn_category))
+
+def grafik_churn_reason(cust_churn_category):
+    import plotly.express as px
+
+    fig = px.bar(
+        cust_churn_category, 
+        x = "total_cust_churn_per_reason", 
+        y = "churn_category", 
+        color = "index_largest", 
+        color_discrete_map = {
+            'largest' : '#FF0000',
+            '' : '#F4b4b4'
+        },
+        orientation = 'h',
+        text = "text",
+    )
+
+    fig.update_layout(
+        autosize = False,
+        width = 650,
+        height = 400,
+        showlegend = False,
+        xaxis=dict(
+            title = "",
+            zeroline=False,
+            showgrid = False,
+            side = 'top'
+        ),
+        yaxis=dict(
+            title = '',
+            visible = True, 
+            showticklabels = True,
+            showgrid = False
+        ),
+        font = dict(
+            size = 9
+        ),
+        plot_bgcolor = 'rgba(0, 0, 0, 0)',
+        paper_bgcolor = 'rgba(0, 0, 0, 0)'
+    )
+
+    hovertemplate = '<b>%{y}</b><br>'\
+                    '%{text}<br>'
+                    
+    fig.update_traces(
+        hovertemplate = hovertemplate
+    )
+
+    return (fig)
+
+def perhitungan_revenue_impact(kubus):
+    # Hitung total revenue per status customernya (status yang tidak ada di data bernilai 0)
+    revenue_per_status = iris_kubus(kubus, ['customer_status']).set_index('customer_status')['total_revenue']
+
+    raw_revenue_stayed, raw_revenue_joined, raw_revenue_churn = revenue_per_status.reindex(
+        ['Stayed', 'Joined', 'Churned'],
+        fill_value = 0
+    ).to_numpy()
+
+    return (raw_revenue_stayed, raw_revenue_joined, raw_revenue_churn)
+
+# Label tampilan untuk nilai dimensi yang kosong (mis. customer tanpa offer)
+LABEL_KOSONG = '(Tidak Ada)'
+
+# Drill-down revenue per segmen dari rollup revenue (tanpa membaca ulang data per baris)
+# Segmen diurutkan menurut ukuran terpilih, grafik menampilkan top_n segmen teratas
+def perhitungan_drilldown_revenue(rollup, dimensi, ukuran, saring = None, top_n = 15, color = '#ff0000'):
+    saring = {
+        kolom : [np.nan if nilai == LABEL_KOSONG else nilai for nilai in daftar_nilai]
+        for kolom, daftar_nilai in (saring or {}).items()
+    }
+    tabel = iris_rollup(rollup, dimensi, saring = saring)
+    tabel = tabel.sort_values(ukuran, ascending = False, ignore_index = True)
+
+    for kolom in dimensi:
+        tabel[kolom] = tabel[kolom].astype(str).where(tabel[kolom].notna(), LABEL_KOSONG)
+
+    teratas = tabel.head(top_n).assign(segmen = lambda tabel: tabel[dimensi].agg(' / '.join, axis = 1))
+    teratas = teratas[['segmen', ukuran]]
+
+    return (tabel, grafik_json(grafik_drilldown_revenue, teratas, ukuran = ukuran, color = color))
+
+def grafik_drilldown_revenue(teratas, ukuran, color):
+    import plotly.express as px
+
+    fig = px.bar(
+        teratas,
+        x = ukuran,
+        y = 'segmen',
+        orientation = 'h',
+        color_discrete_sequence = [color]
+    )
+
+    fig.update_layout(
+        autosize = False,
+        width = 650,
+        height = 450,
+        showlegend = False,
+        xaxis = dict(
+            title = "",
+            zeroline = False,
+            showgrid = False,
+            side = 'top'
+        ),
+        yaxis = dict(
+            title = '',
+            visible = True, 
+            showticklabels = True,
+            showgrid = False,
+            autorange = 'reversed'
+        ),
+        font = dict(
+            size=9
+        ),
+        plot_bgcolor = 'rgba(0, 0, 0, 0)',
+        paper_bgcolor = 'rgba(0, 0, 0, 0)'
+    )
+
+    return (fig)
+
+# Tile KPI berupa HTML biasa (label + nilai), tanpa membuat figure
+def kpi_tile(text1, text2, color):
+    return (f"""
+        <p style='color: {color}; font-size: 14px; font-weight: 300; margin-bottom: 0;'> {text1} </p>
+        <p style='color: {color}; font-size: 18px; font-weight: 600;'> {text2} </p>
+        """)
+
+# All Demografi
+def count_per_gender(kubus):
+    # Gender yang tidak ada di data (mis. extract kecil / filter status kosong) bernilai 0
+    count_data_per_gender = iris_kubus(kubus, ['gender']).set_index('gender')['jumlah_customer']
+    count_male_data, count_female_data = count_data_per_gender.reindex(['Male', 'Female'], fill_value = 0).to_numpy()
+    return (count_male_data, count_female_data)
+
+# Distribusi usia dari jumlah customer per bin yang sudah dihitung di server (tepi bin dari seluruh data)
+# Ukuran JSON grafik hanya bergantung pada jumlah bin, bukan jumlah customer
+def distribusi_umur(hist_umur, status, gender, color):
+    tepi_umur = np.asarray(hist_umur.attrs['tepi_umur'])
+
+    terpilih = hist_umur.index.get_level_values('customer_status').isin(status) & (hist_umur.index.get_level_values('gender') == gender)
+    umur_per_bin = pd.DataFrame({
+        'tengah_bin' : (tepi_umur[:-1] + tepi_umur[1:]) / 2,
+        'rentang' : [f'{awal:.0f} - {akhir:.0f}' for awal, akhir in zip(tepi_umur[:-1], tepi_umur[1:])],
+        'jumlah_customer' : hist_umur[terpilih].sum().to_numpy()
+    })
+
+    return (grafik_json(grafik_distribusi_umur, umur_per_bin, gender = gender, color = color))
+
+def grafik_distribusi_umur(umur_per_bin, gender, color):
+    import plotly.express as px
+
+    fig = px.bar(
+        umur_per_bin,
+        x = 'tengah_bin',
+        y = 'jumlah_customer',
+        hover_name = 'rentang',
+        color_discrete_sequence = [color]
+    )
+
+    fig.update_layout(
+        autosize = False,
+        width = 500,
+        height = 400,
+        bargap = 0.02,
+        showlegend = False,
+        xaxis = dict(
+            title = f"Distribusi Usia Pelanggan<br>{gender}",
+            zeroline = False,
+            showgrid = False
+        ),
+        yaxis = dict(
+            title = "",
+            visible = True, 
+            showticklabels = True,
+            showgrid = False
+        ),
+        font = dict(
+            size=9
+        ),
+        plot_bgcolor = 'rgba(0, 0, 0, 0)',
+        paper_bgcolor = 'rgba(0, 0, 0, 0)'
+    )
+
+    return fig
+
+def married_status(kubus, gender, color):
+    married_per_gender = iris_kubus(kubus, ['married'], saring = {'gender' : [gender]})
+    married_per_gender = married_per_gender[['married', 'jumlah_customer']].rename(columns = {'jumlah_customer' : 'married_per_gender'})
+
+    return (grafik_json(grafik_married_status, married_per_gender, color = color))
+
+def grafik_married_status(married_per_gender, color):
+    import plotly.express as px
+
+    fig = px.pie(
+        married_per_gender, 
+        values = 'married_per_gender', 
+        names = 'married',
+        labels = {
+            'married' : 'is Married?',
+            'married_per_gender' : 'Total Customer'
+        },
+        color = 'married',
+        color_discrete_map = {
+            'Yes' : color[0],
+            'No' : color[1]                                
+        },
+        hole = 0.5
+    )
+
+    fig.update_traces(
+        textposition = 'inside', 
+        textinfo = 'percent+label',
+        pull = [0.01, 0]
+    )
+
+
+    fig.update_layout(
+        autosize = False,
+        width = 500,
+        height = 400,
+        showlegend = False,
+        plot_bgcolor = 'rgba(0, 0, 0, 0)',
+        paper_bgcolor = 'rgba(0, 0, 0, 0)',
+        annotations=[
+            dict(
+                text = 'Married<br>Status', 
+                x = 0.5, 
+                y =0.5, 
+                font_size=20, 
+                showarrow=False
+            )
+        ]
+    )
+    
+    fig.update_annotations(
+        font = dict(
+            family = "sans serif", 
+            color = color[0]
+        )
+    )
+                 
+    return (fig)
+
+def contract_type(kubus, gender):
+    # internet_type kosong sudah diisi 'No Internet Service' saat load (dataset.NILAI_KOSONG)
+    internet_type_per_gender = iris_kubus(kubus, ['contract', 'internet_type'], saring = {'gender' : [gender]})
+    internet_type_per_gender = internet_type_per_gender[['contract', 'internet_type', 'jumlah_customer']].rename(columns = {'jumlah_customer' : 'total_cust_per_internet_type'})
+
+    # px.treemap belum mendukung kolom category pada path
+    internet_type_per_gender = internet_type_per_gender.astype({'contract' : str, 'internet_type' : str})
+
+    return (grafik_json(grafik_contract_type, internet_type_per_gender, gender = gender))
+
+def grafik_contract_type(internet_type_per_gender, gender):
+    import plotly.express as px
+
+    if(gender == 'Male'):
+        color_internet_type = {
+            '(?)':'#9FFFCB',
+            'Fiber Optic' : '#32CD32',
+            'Cable' : '#93DC5C',
+            'DSL' : '#B7E892',
+            'No Internet Service' : '#21D375'                              
+        }
+    else:
+        color_internet_type = {
+            '(?)':'#93E9BE',
+            'Fiber Optic' : '#3A5A40',
+            'Cable' : '#588157',
+            'DSL' : '#5A9F68',
+            'No Internet Service' : '#BBD58E'                              
+        }
+        
+    fig = px.treemap(
+        internet_type_per_gender, 
+        path = [
+            px.Constant('Contract Type'),
+            'contract',
+            'internet_type'
+        ], 
+        values = 'total_cust_per_internet_type',
+        color = 'internet_type',
+        color_discrete_map = color_internet_type,
+        title = f'Contract Status and Internet Type of <br>{gender}'
+    )
+
+    fig.update_layout(
+        autosize = False,
+        width = 525,
+        height = 425,
+        showlegend = False,
+        xaxis = dict(
+            title = f"Distribusi Usia Pelanggan<br>{gender}"
+        ),
+        plot_bgcolor = 'rgba(0, 0, 0, 0)',
+        paper_bgcolor = 'rgba(0, 0, 0, 0)'
+    )
+
+    fig.update_traces(
+        marker = dict(cornerradius = 5)
+    )
+    
+    return (fig)
+    
+    
+# Angka & grafik demografi untuk status yang dipilih
+# hist_umur bisa diberikan dari cache agar bin usia per status tidak dihitung ulang tiap pilihan status
+def perhitungan_demografi(kubus, status, male_color, female_color, hist_umur = None):
+    if hist_umur is None:
+        hist_umur = histogram_umur(kubus)
+    filter_kubus = kubus[kubus['customer_status'].isin(status)]
+
+    count_male_data, count_female_data = count_per_gender(filter_kubus)
+
+    # Semua grafik dikembalikan sebagai JSON figure yang sudah diserialisasi
+    fig_hist_male = distribusi_umur(hist_umur, status, gender = 'Male', color = male_color)
+    fig_hist_female = distribusi_umur(hist_umur, status, gender = 'Female', color = female_color)
+
+    fig_pie_married_male = married_status(filter_kubus, gender = 'Male', color = ('#bfac60', male_color))
+    fig_pie_married_female = married_status(filter_kubus, gender = 'Female', color = ('#469173', female_color))
+    
+    fig_treemap_male = contract_type(filter_kubus, gender = 'Male')
+    fig_treemap_female = contract_type(filter_kubus, gender = 'Female')
+
+    return (
+        count_male_data, count_female_data,
+        fig_hist_male, fig_hist_female,
+        fig_pie_married_male, fig_pie_married_female,
+        fig_treemap_male, fig_treemap_female
+    )
+
+# Risiko Churn
+# Distribusi skor churn per bin (lebar 0.05), ukuran grafik tidak bergantung pada jumlah customer
+def grafik_risiko_churn(skor_per_bin, ambang):
+    import plotly.express as px
+
+    fig = px.bar(
+        skor_per_bin,
+        x = 'tengah_bin',
+        y = 'jumlah_customer',
+        hover_name = 'rentang',
+        color = 'berisiko',
+        color_discrete_map = {
+            True : '#ff0000',
+            False : '#5bb450'
+        }
+    )
+
+    fig.update_layout(
+        autosize = False,
+        width = 650,
+        height = 400,
+        bargap = 0.02,
+        showlegend = False,
+        xaxis = dict(
+            title = f"Skor Risiko Churn (merah = skor &ge; {ambang})",
+            zeroline = False,
+            showgrid = False,
+            range = [0, 1]
+        ),
+        yaxis = dict(
+            title = "",
+            visible = True, 
+            showticklabels = True,
+            showgrid = False
+        ),
+        font = dict(
+            size=9
+        ),
+        plot_bgcolor = 'rgba(0, 0, 0, 0)',
+        paper_bgcolor = 'rgba(0, 0, 0, 0)'
+    )
+
+    return (fig)
+
+# Ringkasan hasil skor (kolom customer_id & skor_churn): jumlah berisiko, rata-rata skor,
+# customer dengan skor tertinggi dan JSON grafik distribusi skornya
+def perhitungan_risiko_churn(hasil_skor, ambang = 0.5, jumlah_teratas = 20, jumlah_bin = 20):
+    skor = hasil_skor['skor_churn'].to_numpy()
+    tepi = np.linspace(0, 1, jumlah_bin + 1)
+
+    skor_per_bin = pd.DataFrame({
+        'tengah_bin' : (tepi[:-1] + tepi[1:]) / 2,
+        'rentang' : [f'{awal:.2f} - {akhir:.2f}' for awal, akhir in zip(tepi[:-1], tepi[1:])],
+        'jumlah_customer' : np.histogram(skor, bins = tepi)[0],
+        'berisiko' : tepi[:-1] >= ambang
+    })
+
+    ringkasan = {
+        'jumlah_customer' : int(len(skor)),
+        'jumlah_berisiko' : int((skor >= ambang).sum()),
+        'rata_skor' : float(skor.mean()) if len(skor) else 0.0
+    }
+    teratas = hasil_skor.nlargest(jumlah_teratas, 'skor_churn').reset_index(drop = True)
+
+    return (ringkasan, teratas, grafik_json(grafik_risiko_churn, skor_per_bin, ambang = ambang))
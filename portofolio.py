@@ -1,35 +1,96 @@
-import plotly.express as px
-import matplotlib.pyplot as plt
+from pathlib import Path
+import json
+import math
+import os
+import time
+
 import streamlit as st
+import numpy as np
 import pandas as pd
 
-# Konfigurasi awal streamlit
-st.set_page_config(
-    page_title = 'Hafiz Akhyar - Portofolio', 
-    page_icon = '👨🏻', 
-    layout = "wide"
+from dataset import (
+    PATH_DATA_LOKAL, URL_DATA, UKURAN_CHUNK, UKURAN_CHUNK_BAWAAN,
+    sumber_data, baca_bertahap, partisi_sumber, token_sumber, gabung_mask, indeks_urut, halaman_data
 )
-
-# Ekstrak data & cleansing
+from agregasi import (
+    JUMLAH_WORKER,
+    bangun_kubus_bertahap, bangun_kubus_paralel, histogram_umur
+)
+from inkremental import muat_keadaan, perbarui_keadaan
+from kueri import BACKEND_KUBUS, bangun_kubus_sql
+import perhitungan
+import instrumentasi
+import aset
+import skoring
+from revenue import UKURAN_REVENUE, bangun_rollup, rollup_sumber
+
+# Panel debug instrumentasi (waktu per section, cache hit/miss, jumlah baris); bisa juga lewat ?debug=1
+TAMPILKAN_DEBUG = os.environ.get('CHURN_DEBUG', '') not in ('', '0')
+
+# Gambar demografi: file di repo lebih diutamakan, URL GitHub hanya sebagai cadangan
+PATH_IMG_MAN = aset.DIR_ASET / 'man.png'
+PATH_IMG_WOMAN = aset.DIR_ASET / 'woman.png'
+URL_IMG_MAN = 'https://raw.githubusercontent.com/hafizakhyar/customer-churn-telco/main/man.png'
+URL_IMG_WOMAN = 'https://raw.githubusercontent.com/hafizakhyar/customer-churn-telco/main/woman.png'
+
+# Ekstrak data & cleansing, beserta kubus agregat dan mask status (keadaan dataset)
 @st.cache_resource
-def ekstrak_data(url_data):
-    #Ekstraksi data
-    raw_data = pd.read_csv(url_data)
+def ekstrak_data(path_data = PATH_DATA_LOKAL, url_data = URL_DATA):
+    instrumentasi.catat_miss('ekstrak_data')
+    # Ekstraksi data (file lokal lebih dulu, URL sebagai cadangan)
+    sumber = sumber_data(path_data, url_data)
 
-    # Copy data ke variabel baru
-    data = raw_data.copy()
-    
-    # Transformasi nama kolom menjadi lowercase
-    data.columns = data.columns.str.lower()
-    data.columns = data.columns.str.replace(' ', '_')
+    # Snapshot Arrow jika CSV tidak berubah, selain itu parsing dengan skema tipe data
+    return (muat_keadaan(sumber))
+
+# Mode streaming: kubus dibangun per chunk tanpa pernah memuat seluruh data ke memori
+# Jika jumlah worker > 1 (dan sumbernya file lokal), partisi sumber diagregasi paralel
+# Backend SQL (duckdb / sqlite) membangun kubus langsung di engine tersebut atas file lokal
+@st.cache_resource
+def ekstrak_kubus_bertahap(path_data = PATH_DATA_LOKAL, url_data = URL_DATA, ukuran_chunk = UKURAN_CHUNK, jumlah_worker = JUMLAH_WORKER, backend = BACKEND_KUBUS):
+    instrumentasi.catat_miss('ekstrak_kubus_bertahap')
+    sumber = sumber_data(path_data, url_data)
+
+    if backend != 'pandas' and isinstance(sumber, Path):
+        kubus = bangun_kubus_sql(sumber, backend)
+    elif jumlah_worker > 1 and isinstance(sumber, Path):
+        kubus = bangun_kubus_paralel(partisi_sumber(sumber), jumlah_worker)
+    else:
+        kubus = bangun_kubus_bertahap(sumber, ukuran_chunk)
+    kubus.attrs['versi'] = token_sumber(sumber)
 
-    # Drop some columns
-    data = data.drop(columns = ['zip_code',	'latitude',	'longitude'])
+    return (kubus)
 
-    return (data)
+# Mode streaming: cuplikan baris pertama untuk tabel data
+@st.cache_resource
+def ekstrak_preview(path_data = PATH_DATA_LOKAL, url_data = URL_DATA, jumlah_baris = 1000):
+    instrumentasi.catat_miss('ekstrak_preview')
+    sumber = sumber_data(path_data, url_data)
+
+    return (next(baca_bertahap(sumber, jumlah_baris)))
+
+# Tampilkan grafik dari JSON figure hasil cache lewat API publik Streamlit
+# Saat cache hit plotly.express tidak dijalankan, tetapi st.plotly_chart tetap membangun & memvalidasi
+# go.Figure dari dict lalu menserialisasinya lagi (~20 ms per grafik); API publik tidak menerima JSON jadi
+# Ukuran grafik mengikuti layout figure, sama seperti use_container_width = False
+def tampilkan_grafik(spec, container = None):
+    with instrumentasi.ukur('kirim_grafik'):
+        return ((st if container is None else container).plotly_chart(json.loads(spec), width = 'content'))
+
+# Data belum ada di lokal maupun cache: tampilkan status unduhan background lalu hentikan rerun ini
+def tunggu_data(url_data):
+    if aset.sedang_diunduh(url_data):
+        st.info('Data sedang diunduh di background, halaman dimuat ulang otomatis...')
+        time.sleep(1)
+        st.rerun()
+
+    st.error(f'Data tidak tersedia secara lokal dan gagal diunduh dari {url_data}.')
+    if st.button('Coba lagi'):
+        aset.mulai_prefetch([url_data], paksa = True)
+        st.rerun()
+    st.stop()
 
 # Ornamen pada header
-@st.cache_resource
 def header():
     spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
     
@@ -53,8 +114,14 @@ def header():
         unsafe_allow_html = True
     )
 
-@st.cache_resource       
-def tampilkan_data(data):
+# Indeks urut per kolom dihitung sekali per versi dataset (data tidak di-hash)
+@st.cache_resource(max_entries = 32, show_spinner = False)
+def ekstrak_indeks_urut(_data, versi, kolom, naik):
+    instrumentasi.catat_miss('ekstrak_indeks_urut')
+    return (indeks_urut(_data, kolom, naik))
+
+# Tabel data dengan paging di server: hanya baris pada halaman yang dipilih yang dikirim ke browser
+def tampilkan_data(data, versi, total_data = None, mask_status = None):
     spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
     row1.header('Data')
     row1.markdown(
@@ -65,7 +132,7 @@ def tampilkan_data(data):
     spacer1, row2, row3, spacer2 = st.columns([0.1, 7.2, 7.2, 0.1])
     row2.metric(
         label = "Total Data", 
-        value = data.shape[0]
+        value = data.shape[0] if total_data is None else total_data
     )
         
     row3.metric(
@@ -74,67 +141,84 @@ def tampilkan_data(data):
     )
     
     spacer1, row4, spacer2 = st.columns([0.1, 7.2, 0.1])
-    row4.dataframe(data)
+    with row4:
+        kolom1, kolom2, kolom3, kolom4 = st.columns([2, 1, 2, 1])
+        kolom_urut = kolom1.selectbox(
+            label = 'Urutkan Berdasarkan',
+            options = ['(urutan asli)'] + list(data.columns)
+        )
+        arah_urut = kolom2.radio(
+            label = 'Urutan',
+            options = ['Naik', 'Turun'],
+            horizontal = True
+        )
+        status = kolom3.multiselect(
+            label = 'Filter Status Customer',
+            options = list(data['customer_status'].cat.categories)
+        )
+        ukuran_halaman = kolom4.selectbox(
+            label = 'Baris per Halaman',
+            options = [25, 50, 100, 250],
+            index = 1
+        )
 
-# Hitung banyak customer yang dikelompokkan berdasarkan status
-@st.cache_resource
-def perhitungan_customer_status(data):
-    # Hitung total data (unik) customer id per status customernya
-    cust_status = data.groupby(['customer_status'], as_index = False).agg(total_cust_status = ('customer_id', pd.Series.nunique))
-
-    # Buat grafik pie
-    fig = px.pie(
-        cust_status, 
-        values = 'total_cust_status', 
-        names = 'customer_status',
-        #hover_data = ['total_cust_status'], 
-        labels = {
-            'customer_status' : 'Customer Status',
-            'total_cust_status' : 'Total Customer'
-        },
-        color = 'customer_status',
-        color_discrete_map = {
-            'Churned' : '#ff0000',
-            'Stayed' : '#5bb450',
-            'Joined' : '#72bf6a'                                 
-        }
-    )
+        if kolom_urut == '(urutan asli)':
+            urutan = np.arange(data.shape[0])
+            urutan = urutan if arah_urut == 'Naik' else urutan[::-1]
+        else:
+            with instrumentasi.ukur('ekstrak_indeks_urut', cache = True):
+                urutan = ekstrak_indeks_urut(data, versi, kolom_urut, arah_urut == 'Naik')
+
+        # Mode streaming tidak punya mask status (data hanya cuplikan), filter langsung pada cuplikannya
+        if not status:
+            mask = None
+        elif mask_status is not None:
+            mask = gabung_mask(mask_status, status)
+        else:
+            mask = data['customer_status'].isin(status).to_numpy()
+
+        total_baris = data.shape[0] if mask is None else int(mask.sum())
+        jumlah_halaman = max(1, math.ceil(total_baris / ukuran_halaman))
+        halaman = st.number_input(
+            label = f'Halaman (dari {jumlah_halaman})',
+            min_value = 1,
+            max_value = jumlah_halaman,
+            value = 1,
+            step = 1
+        )
 
-    fig.update_traces(
-        textposition = 'inside', 
-        textinfo = 'percent+label',
-        pull = [0.1, 0, 0]
-    )
+        with instrumentasi.ukur('halaman_data'):
+            data_halaman, total_baris = halaman_data(data, urutan, halaman, ukuran_halaman, mask)
+        instrumentasi.catat_baris('baris_halaman', data_halaman.shape[0])
+        instrumentasi.catat_baris('baris_terfilter', total_baris)
 
+        with instrumentasi.ukur('kirim_tabel'):
+            st.dataframe(data_halaman)
 
-    fig.update_layout(
-        autosize = False,
-        width = 400,
-        height = 450,
-        showlegend = False,
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-        paper_bgcolor = 'rgba(0, 0, 0, 0)'
-    )
+        awal = (halaman - 1) * ukuran_halaman
+        st.caption(f'Menampilkan baris {min(awal + 1, total_baris)} - {awal + data_halaman.shape[0]} dari {total_baris} baris')
 
-    return (cust_status, fig)
+# Fungsi perhitungan di-cache dengan st.cache_data, key-nya token versi dataset (kubus tidak di-hash)
+@st.cache_data(show_spinner = False)
+def perhitungan_customer_status(_kubus, versi):
+    instrumentasi.catat_miss('perhitungan_customer_status')
+    return (perhitungan.perhitungan_customer_status(_kubus))
 
-@st.cache_resource
-def tampilkan_status_customer(data):
+def tampilkan_status_customer(kubus, versi):
     
     spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
     row1.header('Gambaran Awal')
     
     spacer1, row1, spacer2, row2, spacer3 = st.columns([0.1, 4, 0.1, 3.2, 0.1])
-    cust_status, fig = perhitungan_customer_status(data)
+    with instrumentasi.ukur('perhitungan_customer_status', cache = True):
+        cust_status, fig = perhitungan_customer_status(kubus, versi)
     
-    total_cust_churn = cust_status[cust_status['customer_status'] == 'Churned']['total_cust_status'].values[0]
-    total_joined_churn = cust_status[cust_status['customer_status'] == 'Joined']['total_cust_status'].values[0]
-    total_stay_churn = cust_status[cust_status['customer_status'] == 'Stayed']['total_cust_status'].values[0]
+    total_cust_churn, total_joined_churn, total_stay_churn = cust_status.set_index('customer_status')['total_cust_status'].reindex(
+        ['Churned', 'Joined', 'Stayed'],
+        fill_value = 0
+    ).to_numpy()
     
-    row1.plotly_chart(
-        fig, 
-        use_container_width = False
-    )
+    tampilkan_grafik(fig, container = row1)
     
     row2.markdown(f"""
         Pada grafik Pie disamping, diperoleh fakta bahwa sebanyak <b>{total_cust_churn}</b> 
@@ -151,81 +235,18 @@ def tampilkan_status_customer(data):
         unsafe_allow_html = True                               
     )
 
-@st.cache_resource
-def perhitungan_churn_reason(data):
-    
-    # Hitung total data cust
-    cust_churn_category = data.groupby(['churn_category', 'churn_reason'], as_index = False).agg(total_cust_churn_per_reason = ('customer_id', pd.Series.nunique))
-
-    cust_churn_category['total_cust_churn_per_category'] = cust_churn_category.groupby(['churn_category'], as_index = False)['total_cust_churn_per_reason'].transform(sum)
+@st.cache_data(show_spinner = False)
+def perhitungan_churn_reason(_kubus, versi, top_n = None):
+    instrumentasi.catat_miss('perhitungan_churn_reason')
+    return (perhitungan.perhitungan_churn_reason(_kubus, top_n = top_n))
 
-    cust_churn_category = cust_churn_category.sort_values(
-        by = ['total_cust_churn_per_category', 'total_cust_churn_per_reason'], 
-        ascending = True,
-        ignore_index = True
-    )
-    
-    cust_churn_category['index_largest'] = cust_churn_category.sort_values(['total_cust_churn_per_reason'], ascending = False) \
-             .groupby(['churn_category']) \
-             .cumcount() + 1
-             
-    cust_churn_category['index_largest'] = ['largest' if x == 1 else '' for x in cust_churn_category['index_largest']]
-    cust_churn_category['text'] = cust_churn_category['churn_reason'] + '<br> (' + cust_churn_category['total_cust_churn_per_reason'].astype(str) + ')'
-
-    fig = px.bar(
-        cust_churn_category, 
-        x = "total_cust_churn_per_reason", 
-        y = "churn_category", 
-        color = "index_largest", 
-        color_discrete_map = {
-            'largest' : '#FF0000',
-            '' : '#F4b4b4'
-        },
-        orientation = 'h',
-        text = "text",
-    )
-
-    fig.update_layout(
-        autosize = False,
-        width = 650,
-        height = 400,
-        showlegend = False,
-        xaxis=dict(
-            title = "",
-            zeroline=False,
-            showgrid = False,
-            side = 'top'
-        ),
-        yaxis=dict(
-            title = '',
-            visible = True, 
-            showticklabels = True,
-            showgrid = False
-        ),
-        font = dict(
-            size = 9
-        ),
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-        paper_bgcolor = 'rgba(0, 0, 0, 0)'
-    )
-
-    hovertemplate = '<b>%{y}</b><br>'\
-                    '%{text}<br>'
-                    
-    fig.update_traces(
-        hovertemplate = hovertemplate, 
-        customdata = cust_churn_category["churn_reason"]
-    )
-
-    return(cust_churn_category, fig)
-
-@st.cache_resource
-def tampilkan_alasan_churn(data):
+def tampilkan_alasan_churn(kubus, versi):
     spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
     row1.header('Alasan Customer Churn?')
     
     spacer1, row1, row2 = st.columns([0.1, 5, 6])
-    cust_churn_category, fig = perhitungan_churn_reason(data)
+    with instrumentasi.ukur('perhitungan_churn_reason', cache = True):
+        cust_churn_category, fig = perhitungan_churn_reason(kubus, versi)
     
     row1.markdown(f"""
        <br>Dari hasil penelusuran, ternyata alasan terbesar banyak customer berpindah haluan dari perusahaan adalah
@@ -239,76 +260,117 @@ def tampilkan_alasan_churn(data):
         unsafe_allow_html = True                               
     )
     
-    row2.plotly_chart(
-        fig, 
-        use_container_width = False
-    )
+    tampilkan_grafik(fig, container = row2)
      
-def text_graph(text1, text2, color):
-    fig, [ax1, ax2] = plt.subplots(
-        nrows = 2, 
-        ncols = 1,
-        figsize = (1, 0.5)
-    )
+@st.cache_data(show_spinner = False)
+def perhitungan_revenue_impact(_kubus, versi):
+    instrumentasi.catat_miss('perhitungan_revenue_impact')
+    return (perhitungan.perhitungan_revenue_impact(_kubus))
+
+# Rollup revenue status x contract x offer x city, dibangun sekali per versi dataset dan dipakai bersama
+# oleh semua sesi & drill-down; mode streaming/backend SQL membaca sumber per chunk
+@st.cache_resource(max_entries = 4, show_spinner = False)
+def ekstrak_rollup_revenue(_data, versi):
+    instrumentasi.catat_miss('ekstrak_rollup_revenue')
+    if _data is None:
+        return (rollup_sumber(sumber_data(PATH_DATA_LOKAL, URL_DATA), UKURAN_CHUNK_BAWAAN))
+
+    return (bangun_rollup(_data))
+
+@st.cache_data(max_entries = 64, show_spinner = False)
+def perhitungan_drilldown_revenue(_rollup, versi, dimensi, ukuran, saring):
+    instrumentasi.catat_miss('perhitungan_drilldown_revenue')
+    return (perhitungan.perhitungan_drilldown_revenue(_rollup, list(dimensi), ukuran, saring = dict(saring)))
+
+LABEL_DIMENSI_REVENUE = {
+    'city' : 'Kota',
+    'contract' : 'Contract',
+    'offer' : 'Offer'
+}
+
+# Drill-down revenue: pilih status, ukuran dan dimensi, lalu satu segmen untuk dirinci ke dimensi lainnya
+def tampilkan_drilldown_revenue(data, versi):
+    with instrumentasi.ukur('ekstrak_rollup_revenue', cache = True):
+        rollup = ekstrak_rollup_revenue(data, versi)
 
-    ax1.text(
-        x = 0, 
-        y = 0.2, 
-        s = text1,
-        color = color,
-        fontsize = 14,
-        fontweight = 'light',
+    spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
+    row1.subheader('Rincian Revenue per Segmen')
+
+    spacer1, kolom1, kolom2, kolom3, spacer2 = st.columns([0.1, 3, 3, 3, 0.1])
+    status = kolom1.multiselect(
+        label = 'Status Customer',
+        options = list(rollup.index.levels[0]),
+        default = 'Churned',
+        key = 'revenue_status'
     )
-
-    ax2.text(
-        x = 0, 
-        y = 0.1, 
-        s = text2,
-        color = color,
-        fontsize = 18,
-        fontweight = 'semibold',
+    ukuran = kolom2.selectbox(
+        label = 'Ukuran',
+        options = UKURAN_REVENUE,
+        format_func = lambda nama: nama.replace('_', ' ').title(),
+        key = 'revenue_ukuran'
+    )
+    dimensi = kolom3.selectbox(
+        label = 'Rincian per',
+        options = list(LABEL_DIMENSI_REVENUE),
+        format_func = LABEL_DIMENSI_REVENUE.get,
+        key = 'revenue_dimensi'
     )
 
-    ax1.axis('off')
-    ax2.axis('off')
-    
-    return fig 
+    # Key cache: pilihan yang sudah dinormalisasi (urutan pilihan status tidak mempengaruhi hasil)
+    saring = (('customer_status', tuple(sorted(set(status)))), )
+    with instrumentasi.ukur('perhitungan_drilldown_revenue', cache = True):
+        tabel, fig = perhitungan_drilldown_revenue(rollup, versi, (dimensi, ), ukuran, saring)
 
-@st.cache_resource
-def tampilkan_revenue_impact(data):
-    # Hitung total data (unik) customer id per status customernya
-    revenue_per_status = data.groupby(['customer_status'], as_index = False).agg(total_revenue = ('total_revenue', pd.Series.sum))
+    spacer1, row2, row3 = st.columns([0.1, 5, 6])
+    segmen = row2.selectbox(
+        label = f'Rinci {LABEL_DIMENSI_REVENUE[dimensi]}',
+        options = ['(Semua)'] + tabel[dimensi].tolist(),
+        key = 'revenue_segmen'
+    )
+    if segmen == '(Semua)':
+        row2.dataframe(tabel, hide_index = True)
+    else:
+        # Level kedua: segmen terpilih dirinci ke dimensi revenue lainnya
+        dimensi_lanjut = tuple(nama for nama in LABEL_DIMENSI_REVENUE if nama != dimensi)
+        with instrumentasi.ukur('perhitungan_drilldown_revenue', cache = True):
+            tabel_lanjut, fig = perhitungan_drilldown_revenue(
+                rollup, versi, dimensi_lanjut, ukuran, saring + ((dimensi, (segmen, )), )
+            )
+        row2.dataframe(tabel_lanjut, hide_index = True)
+
+    tampilkan_grafik(fig, container = row3)
 
-    raw_revenue_stayed = revenue_per_status[revenue_per_status['customer_status'] == 'Stayed']['total_revenue'].values[0] 
-    raw_revenue_joined = revenue_per_status[revenue_per_status['customer_status'] == 'Joined']['total_revenue'].values[0]
-    raw_revenue_churn = revenue_per_status[revenue_per_status['customer_status'] == 'Churned']['total_revenue'].values[0]
+def tampilkan_revenue_impact(kubus, versi):
+    with instrumentasi.ukur('perhitungan_revenue_impact', cache = True):
+        raw_revenue_stayed, raw_revenue_joined, raw_revenue_churn = perhitungan_revenue_impact(kubus, versi)
 
     revenue_stayed = round(raw_revenue_stayed / 10**6, 2)
     revenue_joined = round(raw_revenue_joined / 10**6, 2)
     revenue_churn = round(raw_revenue_churn / 10**6, 2)
     
-    fig1 = text_graph('Stayed', '$ ' + str(revenue_stayed) + 'M', '#5bb450')
-    fig2 = text_graph('Joined', '$ ' + str(revenue_joined) + 'M', '#5bb450')
-    fig3 = text_graph('Churn', '$ ' + str(revenue_churn) + 'M', '#ff0000')
+    # '$' ditulis sebagai entity HTML agar tidak dibaca sebagai LaTeX oleh markdown
+    tile1 = perhitungan.kpi_tile('Stayed', '&#36; ' + str(revenue_stayed) + 'M', '#5bb450')
+    tile2 = perhitungan.kpi_tile('Joined', '&#36; ' + str(revenue_joined) + 'M', '#5bb450')
+    tile3 = perhitungan.kpi_tile('Churn', '&#36; ' + str(revenue_churn) + 'M', '#ff0000')
     
     spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
     row1.header('Dampak Terhadap Perusahaan')
     
     spacer1, row2, row3, row4, spacer2 = st.columns([0.1, 3, 3, 3, 0.1])
     
-    row2.pyplot(
-        fig1, 
-        use_container_width = False
+    row2.markdown(
+        tile1, 
+        unsafe_allow_html = True
     )
     
-    row3.pyplot(
-        fig2, 
-        use_container_width = False
+    row3.markdown(
+        tile2, 
+        unsafe_allow_html = True
     )
     
-    row4.pyplot(
-        fig3, 
-        use_container_width = False
+    row4.markdown(
+        tile3, 
+        unsafe_allow_html = True
     )
     
     spacer1, row5, spacer2 = st.columns([0.1, 7.2, 0.1])
@@ -322,156 +384,78 @@ def tampilkan_revenue_impact(data):
         unsafe_allow_html = True
     )
 
-# All Demografi
-def count_per_gender(data):
-    count_data_per_gender = data.groupby(['gender'], as_index = False).agg(count_data_per_gender = ('customer_id', pd.Series.nunique))
-    count_male_data = count_data_per_gender[count_data_per_gender['gender'] == 'Male']['count_data_per_gender'].values[0]
-    count_female_data = count_data_per_gender[count_data_per_gender['gender'] == 'Female']['count_data_per_gender'].values[0]
-    return (count_male_data, count_female_data)
-
-def distribusi_umur(data, gender, color):
-    fig = px.histogram(
-        data[data['gender'] == gender], 
-        x = "age",
-        nbins = 10,
-        color_discrete_sequence=[color]
-    )
+# Model skor churn dari artifact (dilatih & disimpan sekali jika artifact belum ada)
+@st.cache_resource(show_spinner = False)
+def ekstrak_model(path_data = PATH_DATA_LOKAL, url_data = URL_DATA, path_model = skoring.PATH_MODEL):
+    instrumentasi.catat_miss('ekstrak_model')
+    return (skoring.muat_atau_latih(sumber_data(path_data, url_data), path_model))
+
+# Skor churn customer Stayed per versi dataset & model; mode streaming/backend SQL membaca sumber per chunk
+@st.cache_data(show_spinner = False)
+def perhitungan_risiko_churn(_data, _mask_status, _model, versi, versi_model):
+    instrumentasi.catat_miss('perhitungan_risiko_churn')
+    if _data is None:
+        hasil_skor = pd.concat(
+            skoring.skor_bertahap(_model, sumber_data(PATH_DATA_LOKAL, URL_DATA), UKURAN_CHUNK_BAWAAN, ['Stayed']),
+            ignore_index = True
+        )
+    else:
+        # Hanya kolom skoring yang disalin, bukan seluruh kolom customer Stayed
+        stayed = _data[skoring.KOLOM_SKORING][gabung_mask(_mask_status, ['Stayed'])]
+        hasil_skor = pd.DataFrame({
+            'customer_id' : stayed['customer_id'].to_numpy(),
+            'customer_status' : stayed['customer_status'].to_numpy(),
+            'skor_churn' : skoring.skor_churn(_model, stayed).astype('float32')
+        })
+
+    return (perhitungan.perhitungan_risiko_churn(hasil_skor))
+
+def tampilkan_risiko_churn(data, mask_status, versi):
+    with instrumentasi.ukur('ekstrak_model', cache = True):
+        model = ekstrak_model(PATH_DATA_LOKAL, URL_DATA, skoring.PATH_MODEL)
+    with instrumentasi.ukur('perhitungan_risiko_churn', cache = True):
+        ringkasan, teratas, fig = perhitungan_risiko_churn(data, mask_status, model, versi, model['metrik']['dilatih_pada'])
 
-    fig.update_layout(
-        autosize = False,
-        width = 500,
-        height = 400,
-        bargap = 0.02,
-        showlegend = False,
-        xaxis = dict(
-            title = f"Distribusi Usia Pelanggan<br>{gender}",
-            zeroline = False,
-            showgrid = False
-        ),
-        yaxis = dict(
-            title = "",
-            visible = True, 
-            showticklabels = True,
-            showgrid = False
-        ),
-        font = dict(
-            size=9
-        ),
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-        paper_bgcolor = 'rgba(0, 0, 0, 0)'
-    )
+    spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
+    row1.header('Risiko Churn Customer Aktif')
 
-    return fig
-
-def married_status(data, gender, color):
-    married_per_gender = data[data['gender'] == gender].groupby(['married'], as_index = False).agg(married_per_gender = ('customer_id', pd.Series.nunique))
-
-    fig = px.pie(
-        married_per_gender, 
-        values = 'married_per_gender', 
-        names = 'married',
-        labels = {
-            'married' : 'is Married?',
-            'married_per_gender' : 'Total Customer'
-        },
-        color = 'married',
-        color_discrete_map = {
-            'Yes' : color[0],
-            'No' : color[1]                                
-        },
-        hole = 0.5
-    )
+    spacer1, row2, row3, row4, spacer2 = st.columns([0.1, 3, 3, 3, 0.1])
+    row2.markdown(perhitungan.kpi_tile('Customer Stayed', str(ringkasan['jumlah_customer']), '#5bb450'), unsafe_allow_html = True)
+    row3.markdown(perhitungan.kpi_tile('Berisiko Churn', str(ringkasan['jumlah_berisiko']), '#ff0000'), unsafe_allow_html = True)
+    row4.markdown(perhitungan.kpi_tile('Rata-rata Skor', str(round(ringkasan['rata_skor'], 3)), '#ff0000'), unsafe_allow_html = True)
 
-    fig.update_traces(
-        textposition = 'inside', 
-        textinfo = 'percent+label',
-        pull = [0.01, 0]
+    spacer1, row5, row6 = st.columns([0.1, 5, 6])
+    row5.markdown(f"""
+        <br>Skor risiko churn dihitung dengan model regresi logistik yang dilatih dari customer <i>Stayed</i> dan <i>Churned</i>
+        (AUC pada data uji = <b>{round(model['metrik']['auc_uji'], 3)}</b>), berdasarkan lama berlangganan, jenis kontrak,
+        layanan internet, tagihan bulanan, penawaran dan layanan tambahan. Sebanyak <b>{ringkasan['jumlah_berisiko']}</b> customer
+        yang masih aktif memiliki skor di atas 0.5 dan dapat menjadi prioritas program retensi.
+        """,
+        unsafe_allow_html = True
+    )
+    row5.dataframe(
+        teratas[['customer_id', 'skor_churn']],
+        hide_index = True
     )
 
+    tampilkan_grafik(fig, container = row6)
 
-    fig.update_layout(
-        autosize = False,
-        width = 500,
-        height = 400,
-        showlegend = False,
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-        paper_bgcolor = 'rgba(0, 0, 0, 0)',
-        annotations=[
-            dict(
-                text = 'Married<br>Status', 
-                x = 0.5, 
-                y =0.5, 
-                font_size=20, 
-                showarrow=False
-            )
-        ]
-    )
-    
-    fig.update_annotations(
-        font = dict(
-            family = "sans serif", 
-            color = color[0]
-        )
-    )
-                 
-    return (fig)
+# Jumlah customer per bin usia untuk tiap status & gender, dihitung sekali per versi dataset
+@st.cache_data(show_spinner = False)
+def perhitungan_histogram_umur(_kubus, versi):
+    instrumentasi.catat_miss('perhitungan_histogram_umur')
+    return (histogram_umur(_kubus))
 
-def contract_type(data, gender):
-    
-    data = data[data['gender'] == gender]
-    data['internet_type'] = data['internet_type'].fillna('No Internet Service')
-    internet_type_per_gender = data.groupby(['contract', 'internet_type'], as_index = False).agg(total_cust_per_internet_type = ('customer_id', pd.Series.nunique))
- 
-    if(gender == 'Male'):
-        color_internet_type = {
-            '(?)':'#9FFFCB',
-            'Fiber Optic' : '#32CD32',
-            'Cable' : '#93DC5C',
-            'DSL' : '#B7E892',
-            'No Internet Service' : '#21D375'                              
-        }
-    else:
-        color_internet_type = {
-            '(?)':'#93E9BE',
-            'Fiber Optic' : '#3A5A40',
-            'Cable' : '#588157',
-            'DSL' : '#5A9F68',
-            'No Internet Service' : '#BBD58E'                              
-        }
-        
-    fig = px.treemap(
-        internet_type_per_gender, 
-        path = [
-            px.Constant('Contract Type'),
-            'contract',
-            'internet_type'
-        ], 
-        values = 'total_cust_per_internet_type',
-        color = 'internet_type',
-        color_discrete_map = color_internet_type,
-        title = f'Contract Status and Internet Type of <br>{gender}'
-    )
+# Hasil perhitungan demografi per kombinasi status (LRU terbatas), key = status yang sudah dinormalisasi
+@st.cache_data(max_entries = 16, show_spinner = False)
+def perhitungan_demografi(_kubus, versi, status, male_color, female_color):
+    instrumentasi.catat_miss('perhitungan_demografi')
+    with instrumentasi.ukur('perhitungan_histogram_umur', cache = True):
+        hist_umur = perhitungan_histogram_umur(_kubus, versi)
 
-    fig.update_layout(
-        autosize = False,
-        width = 525,
-        height = 425,
-        showlegend = False,
-        xaxis = dict(
-            title = f"Distribusi Usia Pelanggan<br>{gender}"
-        ),
-        plot_bgcolor = 'rgba(0, 0, 0, 0)',
-        paper_bgcolor = 'rgba(0, 0, 0, 0)'
-    )
+    return (perhitungan.perhitungan_demografi(_kubus, status, male_color, female_color, hist_umur = hist_umur))
 
-    fig.update_traces(
-        marker = dict(cornerradius = 5)
-    )
-    
-    return (fig)
-    
-    
-def tampilkan_demografi(data, url_img_man, url_img_woman):
+def tampilkan_demografi(kubus, versi, url_img_man, url_img_woman):
     male_color, female_color = '#fbe280', '#5bbc95'
     
     spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
@@ -489,21 +473,23 @@ def tampilkan_demografi(data, url_img_man, url_img_woman):
         )
         status = st.multiselect(
             label = 'Pilih Status Customers',
-            options = data['customer_status'].unique(),
+            options = kubus['customer_status'].unique(),
             default = 'Stayed'
         )
     
-    filter_data = data.loc[data['customer_status'].isin(status)]
-
-    count_male_data, count_female_data = count_per_gender(filter_data)
-    fig_hist_male = distribusi_umur(filter_data, gender = 'Male', color = male_color)
-    fig_hist_female = distribusi_umur(filter_data, gender = 'Female', color = female_color)
-
-    fig_pie_married_male = married_status(filter_data, gender = 'Male', color = ('#bfac60', male_color))
-    fig_pie_married_female = married_status(filter_data, gender = 'Female', color = ('#469173', female_color))
-    
-    fig_treemap_male = contract_type(filter_data, gender = 'Male')
-    fig_treemap_female = contract_type(filter_data, gender = 'Female')
+    with instrumentasi.ukur('perhitungan_demografi', cache = True):
+        (
+            count_male_data, count_female_data,
+            fig_hist_male, fig_hist_female,
+            fig_pie_married_male, fig_pie_married_female,
+            fig_treemap_male, fig_treemap_female
+        ) = perhitungan_demografi(
+            kubus,
+            versi = versi,
+            status = tuple(sorted(set(status))),
+            male_color = male_color,
+            female_color = female_color
+        )
     
     spacer1, row2, spacer, row3, spacer3 = st.columns([0.1, 3, 0.5, 3, 0.1])
     with row2:
@@ -530,20 +516,11 @@ def tampilkan_demografi(data, url_img_man, url_img_woman):
             unsafe_allow_html = True
         )
         
-        st.plotly_chart(
-            fig_hist_male, 
-            use_container_width = False
-        )
+        tampilkan_grafik(fig_hist_male)
         
-        st.plotly_chart(
-            fig_pie_married_male, 
-            use_container_width = False
-        )
+        tampilkan_grafik(fig_pie_married_male)
         
-        st.plotly_chart(
-            fig_treemap_male, 
-            use_container_width = False
-        )
+        tampilkan_grafik(fig_treemap_male)
         
     with row3:        
         st.markdown(
@@ -569,34 +546,99 @@ def tampilkan_demografi(data, url_img_man, url_img_woman):
             unsafe_allow_html = True
         )
 
-        st.plotly_chart(
-            fig_hist_female, 
-            use_container_width = False
-        )
+        tampilkan_grafik(fig_hist_female)
         
-        st.plotly_chart(
-            fig_pie_married_female, 
-            use_container_width = False
-        )
+        tampilkan_grafik(fig_pie_married_female)
         
-        st.plotly_chart(
-            fig_treemap_female, 
-            use_container_width = False
-        )
+        tampilkan_grafik(fig_treemap_female)
     
     
+# Panel debug: waktu tiap section & tahap pada rerun ini, cache hit/miss, jumlah baris
+# dan ringkasan p50/p95 dari rerun-rerun terakhir
+def tampilkan_debug(catatan):
+    spacer1, row1, spacer2 = st.columns([0.1, 7.2, 0.1])
+    with row1.expander(f"Debug: rerun {catatan['total_detik'] * 1000:.0f} ms", expanded = False):
+        ukuran = pd.DataFrame(catatan['ukuran'])
+        ukuran['waktu_ms'] = ukuran.pop('waktu_detik') * 1000
+        st.dataframe(ukuran.round(2), hide_index = True)
+
+        kolom1, kolom2 = st.columns(2)
+        kolom1.dataframe(pd.DataFrame(catatan['cache']).T.rename_axis('cache'))
+        kolom2.dataframe(pd.Series(catatan['baris'], name = 'jumlah').rename_axis('baris'))
+
+        riwayat = pd.DataFrame(instrumentasi.ringkasan_riwayat())
+        for kolom in ['p50', 'p95', 'maks']:
+            riwayat[f'{kolom}_ms'] = riwayat.pop(f'{kolom}_detik') * 1000
+        st.dataframe(riwayat.round(2), hide_index = True)
+
 if __name__ == "__main__":
-    header()
-    
-    url_data = 'https://raw.githubusercontent.com/hafizakhyar/customer-churn-telco/main/telecom_customer_churn.csv'
-    data = ekstrak_data(url_data)
-    
-    tampilkan_data(data)
-    tampilkan_status_customer(data)
-    tampilkan_alasan_churn(data)
-    tampilkan_revenue_impact(data)
-    
-    url_img_man = 'https://raw.githubusercontent.com/hafizakhyar/customer-churn-telco/main/man.png'
-    url_img_woman = 'https://raw.githubusercontent.com/hafizakhyar/customer-churn-telco/main/woman.png'
-    
-    tampilkan_demografi(data, url_img_man, url_img_woman)
+    # Konfigurasi awal streamlit (hanya saat dijalankan sebagai app, bukan saat diimport)
+    st.set_page_config(
+        page_title = 'Hafiz Akhyar - Portofolio', 
+        page_icon = '👨🏻', 
+        layout = "wide"
+    )
+
+    # Backend SQL juga hanya memakai kubus (tanpa data per baris di memori), sama seperti mode streaming
+    mode_kubus = UKURAN_CHUNK or BACKEND_KUBUS != 'pandas'
+    instrumentasi.mulai_rerun(mode = 'streaming' if mode_kubus else 'memori', backend = BACKEND_KUBUS)
+
+    # Sumber remote yang tidak ada di lokal mulai diunduh di background (render tidak menunggu)
+    aset.mulai_prefetch([
+        url for path, url in [(PATH_DATA_LOKAL, URL_DATA), (PATH_IMG_MAN, URL_IMG_MAN), (PATH_IMG_WOMAN, URL_IMG_WOMAN)]
+        if aset.cari_aset(path, url) is None
+    ])
+
+    with instrumentasi.ukur('header', jenis = 'section'):
+        header()
+
+    if not isinstance(sumber_data(PATH_DATA_LOKAL, URL_DATA), Path):
+        tunggu_data(URL_DATA)
+    
+    if mode_kubus:
+        # Mode streaming: semua section dirender dari kubus hasil gabungan agregat per chunk
+        with instrumentasi.ukur('ekstrak_kubus_bertahap', cache = True):
+            kubus = ekstrak_kubus_bertahap(PATH_DATA_LOKAL, URL_DATA, UKURAN_CHUNK_BAWAAN, JUMLAH_WORKER, BACKEND_KUBUS)
+        with instrumentasi.ukur('ekstrak_preview', cache = True):
+            data = ekstrak_preview(PATH_DATA_LOKAL, URL_DATA)
+        mask_status = None
+        total_data = int(kubus['jumlah_customer'].sum())
+        versi = kubus.attrs['versi']
+    else:
+        # Baris yang ditambahkan ke file sumber diterapkan inkremental tanpa parse ulang seluruh data
+        with instrumentasi.ukur('ekstrak_data', cache = True):
+            keadaan = ekstrak_data(PATH_DATA_LOKAL, URL_DATA)
+        with instrumentasi.ukur('perbarui_keadaan'):
+            keadaan = perbarui_keadaan(keadaan)
+        data, kubus, mask_status = keadaan['data'], keadaan['kubus'], keadaan['mask_status']
+        total_data = None
+
+        # Token versi dataset (hash sumber) sebagai key cache perhitungan
+        versi = keadaan['versi']
+
+    instrumentasi.catat_baris('data', data.shape[0] if total_data is None else total_data)
+    instrumentasi.catat_baris('kubus', kubus.shape[0])
+    
+    with instrumentasi.ukur('tampilkan_data', jenis = 'section'):
+        tampilkan_data(data, versi, total_data, mask_status)
+    with instrumentasi.ukur('tampilkan_status_customer', jenis = 'section'):
+        tampilkan_status_customer(kubus, versi)
+    with instrumentasi.ukur('tampilkan_alasan_churn', jenis = 'section'):
+        tampilkan_alasan_churn(kubus, versi)
+    with instrumentasi.ukur('tampilkan_revenue_impact', jenis = 'section'):
+        tampilkan_revenue_impact(kubus, versi)
+    with instrumentasi.ukur('tampilkan_drilldown_revenue', jenis = 'section'):
+        tampilkan_drilldown_revenue(None if mode_kubus else data, versi)
+    with instrumentasi.ukur('tampilkan_risiko_churn', jenis = 'section'):
+        tampilkan_risiko_churn(None if mode_kubus else data, mask_status, versi)
+    
+    # Gambar ikut di repo, di-inline sebagai base64 (URL GitHub hanya jika file lokal & cache tidak ada)
+    url_img_man = aset.sumber_gambar(PATH_IMG_MAN, URL_IMG_MAN)
+    url_img_woman = aset.sumber_gambar(PATH_IMG_WOMAN, URL_IMG_WOMAN)
+    
+    with instrumentasi.ukur('tampilkan_demografi', jenis = 'section'):
+        tampilkan_demografi(kubus, versi, url_img_man, url_img_woman)
+
+    catatan = instrumentasi.selesai_rerun()
+    if TAMPILKAN_DEBUG or st.query_params.get('debug') == '1':
+        tampilkan_debug(catatan)
@@ -0,0 +1,80 @@
+# Rollup revenue per segmen (status x contract x offer x city) untuk analisis revenue-at-risk
+# Semua ukuran revenue dijumlahkan dalam satu kali groupby; drill-down apa pun cukup mengiris rollup
+# yang sudah terurut (MultiIndex) tanpa membaca ulang data per baris
+import numpy as np
+import pandas as pd
+
+from dataset import UKURAN_CHUNK_BAWAAN, baca_bertahap
+
+DIMENSI_REVENUE = ['customer_status', 'contract', 'offer', 'city']
+
+UKURAN_REVENUE = [
+    'total_revenue',
+    'total_charges',
+    'total_refunds',
+    'total_extra_data_charges',
+    'total_long_distance_charges'
+]
+
+# Kolom yang dibutuhkan untuk membangun rollup (dipakai juga saat membaca sumber per chunk)
+KOLOM_REVENUE = DIMENSI_REVENUE + UKURAN_REVENUE
+
+# Rollup parsial satu frame: jumlah customer & total tiap ukuran per segmen
+# Mengasumsikan customer_id unik, jumlah customer = jumlah baris
+def rollup_parsial(data):
+    parsial = data.groupby(
+        DIMENSI_REVENUE,
+        observed = True,
+        dropna = False
+    ).agg(
+        jumlah_customer = ('customer_status', 'size'),
+        **{ukuran : (ukuran, 'sum') for ukuran in UKURAN_REVENUE}
+    )
+
+    return (parsial.astype({'jumlah_customer' : 'int64', **{ukuran : 'float64' for ukuran in UKURAN_REVENUE}}))
+
+# Gabungkan rollup parsial (kategori tiap chunk bisa berbeda), hasil akhir terurut per segmen
+def gabung_rollup(daftar_parsial):
+    gabungan = pd.concat([parsial.reset_index() for parsial in daftar_parsial], ignore_index = True)
+    gabungan = gabungan.astype({kolom : object for kolom in DIMENSI_REVENUE})
+
+    rollup = gabungan.groupby(DIMENSI_REVENUE, dropna = False)[['jumlah_customer'] + UKURAN_REVENUE].sum()
+
+    return (rollup_final(rollup.reset_index()))
+
+# Dimensi dijadikan category lalu MultiIndex terurut, sehingga irisan per status / segmen berupa lookup index
+def rollup_final(rollup):
+    rollup = rollup.astype({kolom : 'category' for kolom in DIMENSI_REVENUE})
+
+    return (rollup.set_index(DIMENSI_REVENUE).sort_index())
+
+def bangun_rollup(data):
+    return (rollup_final(rollup_parsial(data[KOLOM_REVENUE]).reset_index()))
+
+# Rollup dari aliran chunk: tiap chunk dilipat ke rollup berjalan (memori terbatas ukuran chunk)
+def bangun_rollup_bertahap(daftar_chunk):
+    rollup = None
+    for chunk in daftar_chunk:
+        parsial = rollup_parsial(chunk)
+        rollup = gabung_rollup([parsial] if rollup is None else [rollup, parsial])
+
+    return (rollup)
+
+def rollup_sumber(sumber, ukuran_chunk = UKURAN_CHUNK_BAWAAN):
+    return (bangun_rollup_bertahap(baca_bertahap(sumber, ukuran_chunk, KOLOM_REVENUE)))
+
+# Drill-down: filter per dimensi (list nilai) lalu jumlahkan ke dimensi yang diminta
+# Filter status (level pertama index) memakai lookup index terurut, dimensi lain memakai mask level
+def iris_rollup(rollup, dimensi, saring = None):
+    saring = dict(saring or {})
+    if 'customer_status' in saring:
+        status = [nilai for nilai in saring.pop('customer_status') if nilai in rollup.index.levels[0]]
+        rollup = rollup.loc[status]
+
+    if saring:
+        mask = np.ones(len(rollup), dtype = bool)
+        for kolom, nilai in saring.items():
+            mask &= rollup.index.get_level_values(kolom).isin(nilai)
+        rollup = rollup[mask]
+
+    return (rollup.groupby(level = dimensi, observed = True, dropna = False).sum().reset_index())
@@ -0,0 +1,270 @@
+# Skoring risiko churn: regresi logistik (NumPy) atas fitur per customer dari dataset yang sama dengan dashboard
+#
+#   python skoring.py latih telecom_customer_churn.csv
+#   python skoring.py skor data_besar.csv --output skor.csv --ukuran-chunk 500000
+#
+# Model dilatih pada customer Stayed vs Churned lalu disimpan sebagai artifact .npz, sehingga dashboard
+# cukup memuatnya saat startup. Skor dihitung vektor per batch tanpa membentuk matriks one-hot:
+# logit = bias + fitur numerik terstandar @ bobot + bobot kategori yang diambil dengan kode kategorinya
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset import DIR_SNAPSHOT, PATH_DATA_LOKAL, URL_DATA, UKURAN_CHUNK_BAWAAN, sumber_data, baca_bertahap
+
+# Lokasi artifact model
+PATH_MODEL = Path(os.environ.get('CHURN_MODEL_PATH', DIR_SNAPSHOT / 'model_churn.npz'))
+
+# Naikkan jika fitur / cara encoding berubah supaya artifact lama dilatih ulang
+VERSI_MODEL = 1
+
+FITUR_NUMERIK = [
+    'age', 'number_of_dependents', 'number_of_referrals', 'tenure_in_months',
+    'avg_monthly_long_distance_charges', 'avg_monthly_gb_download', 'monthly_charge'
+]
+
+FITUR_KATEGORI = [
+    'gender', 'married', 'offer', 'phone_service', 'multiple_lines', 'internet_type',
+    'online_security', 'online_backup', 'device_protection_plan', 'premium_tech_support',
+    'streaming_tv', 'streaming_movies', 'streaming_music', 'unlimited_data',
+    'contract', 'paperless_billing', 'payment_method'
+]
+
+KOLOM_SKORING = ['customer_id', 'customer_status'] + FITUR_NUMERIK + FITUR_KATEGORI
+
+# Status yang dipakai melatih model (Joined belum punya riwayat cukup), label 1 = Churned
+STATUS_LATIH = ['Stayed', 'Churned']
+
+# Fitur numerik terstandar (nilai kosong = rata-rata data latih = 0)
+def fitur_numerik(data, model):
+    nilai = data[FITUR_NUMERIK].to_numpy(dtype = 'float64', na_value = np.nan)
+    nilai = (nilai - model['rata']) / model['skala']
+
+    return (np.nan_to_num(nilai, nan = 0.0))
+
+# Kode kategori per kolom terhadap kosakata model; nilai kosong / tidak dikenal = -1,
+# yang pada indeks numpy menunjuk slot terakhir bobot kategori (slot khusus untuk nilai tersebut)
+def kode_kategori(data, kolom, kosakata):
+    if isinstance(data[kolom].dtype, pd.CategoricalDtype):
+        return (data[kolom].cat.set_categories(kosakata).cat.codes.to_numpy())
+
+    return (pd.Categorical(data[kolom], categories = kosakata).codes)
+
+# Matriks fitur lengkap (dengan one-hot) hanya untuk pelatihan, kolom pertama = intercept
+def matriks_latih(data, model):
+    bagian = [np.ones((len(data), 1)), fitur_numerik(data, model)]
+    for kolom in FITUR_KATEGORI:
+        kode = kode_kategori(data, kolom, model['kosakata'][kolom])
+        one_hot = np.zeros((len(data), len(model['kosakata'][kolom]) + 1))
+        one_hot[np.arange(len(data)), kode] = 1
+        bagian.append(one_hot)
+
+    return (np.hstack(bagian))
+
+def sigmoid(logit):
+    return (1 / (1 + np.exp(-np.clip(logit, -35, 35))))
+
+# Regresi logistik dengan regularisasi L2 (intercept tidak diregularisasi), diselesaikan dengan Newton / IRLS
+def regresi_logistik(X, y, l2 = 1.0, maks_iterasi = 50, toleransi = 1e-8):
+    bobot = np.zeros(X.shape[1])
+    penalti = np.full(X.shape[1], l2)
+    penalti[0] = 0
+
+    for _ in range(maks_iterasi):
+        peluang = sigmoid(X @ bobot)
+        gradien = X.T @ (peluang - y) + penalti * bobot
+        hessian = (X.T * (peluang * (1 - peluang))) @ X + np.diag(penalti)
+        langkah = np.linalg.solve(hessian, gradien)
+        bobot -= langkah
+        if np.abs(langkah).max() < toleransi:
+            break
+
+    return (bobot)
+
+# AUC dari peringkat skor (setara Mann-Whitney U)
+def auc(y, skor):
+    peringkat = pd.Series(skor).rank().to_numpy()
+    jumlah_positif = y.sum()
+    jumlah_negatif = len(y) - jumlah_positif
+
+    return (float((peringkat[y == 1].sum() - jumlah_positif * (jumlah_positif + 1) / 2) / (jumlah_positif * jumlah_negatif)))
+
+def latih_bobot(data, l2):
+    nilai = data[FITUR_NUMERIK].to_numpy(dtype = 'float64', na_value = np.nan)
+    skala = np.nanstd(nilai, axis = 0)
+    model = {
+        'rata' : np.nanmean(nilai, axis = 0),
+        'skala' : np.where(skala > 0, skala, 1.0),
+        'kosakata' : {
+            kolom : sorted(str(nilai) for nilai in data[kolom].dropna().unique())
+            for kolom in FITUR_KATEGORI
+        }
+    }
+
+    y = (data['customer_status'] == 'Churned').to_numpy(dtype = 'float64')
+    bobot = regresi_logistik(matriks_latih(data, model), y, l2 = l2)
+
+    # Bobot dipecah per bagian agar skoring tidak perlu matriks one-hot
+    model['bias'] = float(bobot[0])
+    model['bobot_numerik'] = bobot[1:len(FITUR_NUMERIK) + 1]
+    posisi = len(FITUR_NUMERIK) + 1
+    model['bobot_kategori'] = {}
+    for kolom in FITUR_KATEGORI:
+        jumlah = len(model['kosakata'][kolom]) + 1
+        model['bobot_kategori'][kolom] = bobot[posisi:posisi + jumlah]
+        posisi += jumlah
+
+    return (model)
+
+# Latih model pada customer Stayed & Churned; AUC diukur pada 20% data yang disisihkan,
+# lalu model akhir dilatih ulang dengan seluruh data
+def latih_model(data, l2 = 1.0, seed = 0):
+    mulai = time.perf_counter()
+    data = data[data['customer_status'].isin(STATUS_LATIH)].reset_index(drop = True)
+
+    acak = np.random.default_rng(seed).permutation(len(data))
+    uji = np.zeros(len(data), dtype = bool)
+    uji[acak[:len(data) // 5]] = True
+
+    model_uji = latih_bobot(data[~uji], l2)
+    y_uji = (data.loc[uji, 'customer_status'] == 'Churned').to_numpy(dtype = 'int8')
+
+    model = latih_bobot(data, l2)
+    model['metrik'] = {
+        'versi_model' : VERSI_MODEL,
+        'jumlah_latih' : int(len(data)),
+        'proporsi_churn' : float((data['customer_status'] == 'Churned').mean()),
+        'auc_uji' : auc(y_uji, skor_churn(model_uji, data[uji])),
+        'l2' : l2,
+        'waktu_latih_detik' : time.perf_counter() - mulai,
+        'dilatih_pada' : time.time()
+    }
+
+    return (model)
+
+# Peluang churn tiap baris (vektor, tanpa matriks one-hot)
+def skor_churn(model, data):
+    logit = model['bias'] + fitur_numerik(data, model) @ model['bobot_numerik']
+    for kolom in FITUR_KATEGORI:
+        logit += model['bobot_kategori'][kolom][kode_kategori(data, kolom, model['kosakata'][kolom])]
+
+    return (sigmoid(logit))
+
+# Simpan artifact secara atomik: array bobot + metadata JSON (tanpa pickle)
+def simpan_model(model, path = PATH_MODEL):
+    path = Path(path)
+    path.parent.mkdir(parents = True, exist_ok = True)
+    meta = {'kosakata' : model['kosakata'], 'bias' : model['bias'], 'metrik' : model['metrik']}
+    array = {f'kategori_{kolom}' : bobot for kolom, bobot in model['bobot_kategori'].items()}
+
+    path_sementara = path.with_suffix(f'.{os.getpid()}.tmp')
+    with open(path_sementara, 'wb') as file:
+        np.savez(
+            file,
+            meta = np.array(json.dumps(meta)),
+            rata = model['rata'],
+            skala = model['skala'],
+            bobot_numerik = model['bobot_numerik'],
+            **array
+        )
+    os.replace(path_sementara, path)
+
+    return (path)
+
+# Muat artifact; None jika tidak ada atau dibuat oleh versi model lain
+def muat_model(path = PATH_MODEL):
+    if not Path(path).is_file():
+        return (None)
+
+    with np.load(path, allow_pickle = False) as isi:
+        meta = json.loads(str(isi['meta']))
+        if meta['metrik'].get('versi_model') != VERSI_MODEL:
+            return (None)
+
+        return ({
+            'kosakata' : meta['kosakata'],
+            'bias' : meta['bias'],
+            'metrik' : meta['metrik'],
+            'rata' : isi['rata'],
+            'skala' : isi['skala'],
+            'bobot_numerik' : isi['bobot_numerik'],
+            'bobot_kategori' : {kolom : isi[f'kategori_{kolom}'] for kolom in FITUR_KATEGORI}
+        })
+
+# Data latih dari sumber, hanya kolom fitur & status yang dibaca
+def baca_data_latih(sumber, ukuran_chunk = UKURAN_CHUNK_BAWAAN):
+    return (pd.concat(
+        [chunk[chunk['customer_status'].isin(STATUS_LATIH)] for chunk in baca_bertahap(sumber, ukuran_chunk, KOLOM_SKORING)],
+        ignore_index = True
+    ))
+
+# Artifact jika sudah ada, selain itu latih sekali dari sumber lalu simpan
+def muat_atau_latih(sumber, path = PATH_MODEL):
+    model = muat_model(path)
+    if model is None:
+        model = latih_model(baca_data_latih(sumber))
+        simpan_model(model, path)
+
+    return (model)
+
+# Skoring bertahap: per chunk hanya id, status & skor yang disimpan (memori terbatas ukuran chunk)
+def skor_bertahap(model, sumber, ukuran_chunk = UKURAN_CHUNK_BAWAAN, status = None):
+    for chunk in baca_bertahap(sumber, ukuran_chunk, KOLOM_SKORING):
+        if status is not None:
+            chunk = chunk[chunk['customer_status'].isin(status)]
+
+        yield pd.DataFrame({
+            'customer_id' : chunk['customer_id'].to_numpy(),
+            'customer_status' : chunk['customer_status'].to_numpy(),
+            'skor_churn' : skor_churn(model, chunk).astype('float32')
+        })
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Skoring risiko churn (regresi logistik)')
+    sub = parser.add_subparsers(dest = 'perintah', required = True)
+
+    parser_latih = sub.add_parser('latih', help = 'latih model dan simpan artifact')
+    parser_latih.add_argument('sumber', nargs = '?', type = Path)
+    parser_latih.add_argument('--model', type = Path, default = PATH_MODEL)
+    parser_latih.add_argument('--l2', type = float, default = 1.0)
+
+    parser_skor = sub.add_parser('skor', help = 'skor file customer per chunk dengan artifact model')
+    parser_skor.add_argument('sumber', type = Path, help = 'file CSV / Parquet atau folder dataset Parquet')
+    parser_skor.add_argument('--output', type = Path, default = Path('skor_churn.csv'))
+    parser_skor.add_argument('--model', type = Path, default = PATH_MODEL)
+    parser_skor.add_argument('--ukuran-chunk', type = int, default = UKURAN_CHUNK_BAWAAN)
+    parser_skor.add_argument('--status', nargs = '+', default = ['Stayed'], help = 'status yang diskor (default Stayed)')
+    parser_skor.add_argument('--semua-status', action = 'store_true')
+    args = parser.parse_args(argv)
+
+    if args.perintah == 'latih':
+        sumber = args.sumber or sumber_data(PATH_DATA_LOKAL, URL_DATA)
+        model = latih_model(baca_data_latih(sumber), l2 = args.l2)
+        simpan_model(model, args.model)
+        print(json.dumps(model['metrik'], indent = 2))
+
+        return (0)
+
+    model = muat_model(args.model)
+    if model is None:
+        parser.error(f'artifact model {args.model} tidak ada atau versinya berbeda, jalankan "python skoring.py latih" dulu')
+
+    mulai = time.perf_counter()
+    jumlah = 0
+    args.output.parent.mkdir(parents = True, exist_ok = True)
+    with open(args.output, 'w', newline = '') as file:
+        for nomor, hasil in enumerate(skor_bertahap(model, args.sumber, args.ukuran_chunk, None if args.semua_status else args.status)):
+            hasil.to_csv(file, header = nomor == 0, index = False, float_format = '%.6f')
+            jumlah += len(hasil)
+    print(f'{jumlah} customer diskor dalam {time.perf_counter() - mulai:.2f} detik -> {args.output}')
+
+    return (0)
+
+if __name__ == '__main__':
+    sys.exit(main())
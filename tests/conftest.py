@@ -0,0 +1,5 @@
+# Modul aplikasi berada di root repo (bukan package), tambahkan ke sys.path untuk test
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from agregasi import JUMLAH_BIN_UMUR, bangun_kubus, histogram_umur, tepi_bin_umur
+from dataset import PATH_DATA_LOKAL, baca_csv
+
+# Extract satu baris: semua usia sama, tepi bin harus tetap unik
+def test_tepi_bin_umur_usia_sama():
+    tepi = tepi_bin_umur(pd.Series([42, 42]))
+
+    assert len(tepi) == JUMLAH_BIN_UMUR + 1
+    assert (np.diff(tepi) > 0).all()
+    assert tepi[0] < 42 < tepi[-1]
+
+def test_kubus_satu_baris():
+    data = baca_csv(PATH_DATA_LOKAL).head(1)
+
+    kubus = bangun_kubus(data)
+    hist = histogram_umur(kubus)
+
+    assert kubus['jumlah_customer'].sum() == 1
+    assert hist.to_numpy().sum() == 1
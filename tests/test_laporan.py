@@ -0,0 +1,34 @@
+import json
+
+import pandas as pd
+
+from dataset import PATH_DATA_LOKAL
+import laporan
+
+def tulis_extract(path, saring):
+    data = pd.read_csv(PATH_DATA_LOKAL)
+    data[saring(data)].to_csv(path, index = False)
+
+    return (path)
+
+# Extract regional tanpa customer Joined: status yang tidak ada dilaporkan 0, bukan IndexError
+def test_laporan_tanpa_status_joined(tmp_path):
+    sumber = tulis_extract(tmp_path / 'wilayah.csv', lambda data: data['Customer Status'] != 'Joined')
+
+    assert laporan.main([str(sumber), '--output', str(tmp_path / 'laporan'), '--format', 'json', '--jumlah-worker', '1']) == 0
+
+    hasil = json.loads((tmp_path / 'laporan' / 'wilayah' / 'laporan.json').read_text())
+    assert hasil['revenue']['Joined'] == 0
+    assert hasil['revenue']['Stayed'] > 0
+    assert 'Joined' not in hasil['demografi']
+
+# Extract dengan satu gender saja: jumlah gender lainnya 0
+def test_laporan_satu_gender(tmp_path):
+    sumber = tulis_extract(tmp_path / 'female.csv', lambda data: data['Gender'] == 'Female')
+
+    assert laporan.main([str(sumber), '--output', str(tmp_path / 'laporan'), '--format', 'json', '--jumlah-worker', '1']) == 0
+
+    hasil = json.loads((tmp_path / 'laporan' / 'female' / 'laporan.json').read_text())
+    for jumlah in hasil['demografi'].values():
+        assert jumlah['Male'] == 0
+        assert jumlah['Female'] > 0